@@ -1,88 +1,251 @@
+import time
+from multiprocessing import current_process
+from typing import TYPE_CHECKING
+
 import numpy as np
-import pm4py
-from pm4py.objects.log.obj import EventLog
-from pm4py.objects.petri_net.obj import PetriNet, Marking
-from pm4py.objects.petri_net.utils import petri_utils
-from sortedcontainers import SortedSet
+import pandas as pd
+
+from compactnet import CompactNet
+from footprint import SparseFootprint, directlyFollowsPairs, directlyFollowsMatrix, footprintFromDirectlyFollows
+from logcache import ColumnarLog
+from logsummary import LogSummary, acceptsLogSummary
+from parallelmining import enumerateRowRelations, summariseLog
+from placeenumeration import EnumerationBudget, anchoredRelations, bitmaskOf, findMaximalRelations
+from profiling import PhaseProfiler
+
+# pm4py is only loaded when a pm4py petri net is exported (CompactNet.toPetriNet), mining itself does not need it
+if TYPE_CHECKING:
+    from pm4py.objects.log.obj import EventLog
 
 
 class G2_AlphaAlgorithm:
 
-    def __init__(self, numberStartTokens, numberEndTokens):
+    def __init__(self, numberStartTokens, numberEndTokens, maxSetSize=None, workers=1, traceMemory=False,
+                 phaseCallback=None, sparse=False, timeLimit=None, maxCandidates=None):
         """
         Initialises a G2_AlphaAlgorithm; an instance of G2_AlphaAlgorithm contains the following instance variables:
         ---
         :param numberStartTokens: number of start tokens for the petri net
         :param numberEndTokens: number of end tokens for the petri net
+        :param maxSetSize: optional cap for the number of activities on the non-anchor side of a place
+        :param workers: number of worker processes; with more than one, the log is summarised in shards of cases and
+            the places are enumerated one anchor activity per task in a process pool; inside a daemonic process
+            (e.g. a job of a multiprocessing.Pool, such as Analysis.run with workers) no pool can be started, so
+            the algorithm then runs in that process as with one worker
+        :param traceMemory: if true, the peak memory of every phase is measured with tracemalloc
+        :param phaseCallback: optional function that is called with the phase name and its PhaseRecord after every
+            phase, e.g. to log or collect the measurements of long runs
+        :param sparse: if true, the footprint is kept as a SparseFootprint (directly-follows pairs in compressed sparse
+            row form) and the dense matrices are only built on request, for logs with thousands of activities
+        :param timeLimit: optional number of seconds after the start of a run at which the place enumeration stops
+        :param maxCandidates: optional number of candidate relations after which the place enumeration stops; with
+            either limit, the anchor activities with the fewest candidates are enumerated first, in this process,
+            and the petri net is built from the places found until the limit was reached
         :var numberStartTokens
         :var numberEndTokens
-        :var dataLog: event log, as defined by the pm4py library
-        :var net: a PetriNet, as defined by the pm4py library
-        :var startEvents: a list of all start events in the data
-        :var endEvents: a list of all end events in the data
-        :var start: start place of the petri net, as defined by the pm4py library
-        :var end: end place of the petri net, as defined by the pm4py library
+        :var maxSetSize
+        :var workers
+        :var traceMemory
+        :var phaseCallback
+        :var sparse
+        :var timeLimit
+        :var maxCandidates
+        :var dataLog: log the petri net was mined from: a LogSummary (event logs are summarised in a single pass),
+            a ColumnarLog (for DataFrames) or, when several workers summarise it, an event log as defined by pm4py;
+            the traces of later updates are merged into it when getDataLog or getLogSummary is called
+        :var logUpdates: list with the summaries of the traces passed to update that are not merged into dataLog yet
+        :var compactNet: the mined petri net as CompactNet (integer ids and incidence matrices)
+        :var net: a PetriNet, as defined by the pm4py library; exported from compactNet on request, None until then
+        :var startActivities: a list of all start activities in the data
+        :var endActivities: a list of all end activities in the data
+        :var startEvents: the transitions of the start activities in the petri net, exported with net
+        :var endEvents: the transitions of the end activities in the petri net, exported with net
+        :var start: start place of the petri net, as defined by the pm4py library, exported with net
+        :var end: end place of the petri net, as defined by the pm4py library, exported with net
         :var initialMarking: initial marking for visualising the petri net, as defined by the pm4py library
         :var finalMarking: final marking for visualising the petri net, as defined by the pm4py library
         :var activityToTransition: python dictionary with format (key: index number, value: transition)
         :var activityIsKey: python dictionary with format (key: activity, value: index)
         :var indexIsKey: python dictionary with format (key: index, value: activity)
-        :var footprintMatrix: footprint matrix of the data
+        :var directlyFollowsMatrix: boolean matrix, cell [a][b] is true if activity b directly follows activity a
+            (None in sparse mode until getDirectlyFollowsMatrix is called)
+        :var footprintMatrix: footprint matrix of the data (int8; 1: causal, -1: reverse causal, 2: parallel, 0: choice;
+            None in sparse mode until getFootprintMatrix is called)
+        :var sparseFootprint: SparseFootprint of the data in sparse mode, None otherwise
+        :var rowRelations: python dictionary with format (key: (arc anchor point, row number), value: list of sets)
         :var setDict: python dictionary with format (key: set, value: arc anchor point)
+        :var incompleteRows: set of rows whose relations were not (or not completely) enumerated within the limits
+        :var profiler: PhaseProfiler with the wall time, call count, sizes and memory peak of every phase of the
+            last run
         """
         self.numberStartTokens = numberStartTokens
         self.numberEndTokens = numberEndTokens
-        self.dataLog = EventLog()
-        self.net = PetriNet()
+        self.maxSetSize = maxSetSize
+        self.workers = workers
+        self.traceMemory = traceMemory
+        self.phaseCallback = phaseCallback
+        self.sparse = sparse
+        self.timeLimit = timeLimit
+        self.maxCandidates = maxCandidates
+        self.dataLog = LogSummary()
+        self.logUpdates: list[LogSummary | ColumnarLog] = []
+        self.compactNet: CompactNet | None = None
+        self.net = None
+        self.startActivities: list[str] = []
+        self.endActivities: list[str] = []
         self.startEvents = []
         self.endEvents = []
-        self.start = PetriNet.Place("start")
-        self.end = PetriNet.Place("end")
-        self.initialMarking = Marking()
-        self.finalMarking = Marking()
+        self.start = None
+        self.end = None
+        self.initialMarking = None
+        self.finalMarking = None
         self.activityToTransition = dict()
         self.activityIsKey = dict()
         self.indexIsKey = dict()
+        self.directlyFollowsMatrix = np.empty(1)
         self.footprintMatrix = np.empty(1)
+        self.sparseFootprint: SparseFootprint | None = None
+        self.rowRelations: dict[tuple[str, int], list[tuple[int]]] = dict()
         self.setDict: dict[tuple[int], str] = dict()
+        self.incompleteRows: set[int] = set()
+        self.profiler = PhaseProfiler(traceMemory, phaseCallback)
 
-    def createPetriNet(self, log: EventLog):
+    @acceptsLogSummary
+    def createPetriNet(self, log: "EventLog | LogSummary | ColumnarLog | pd.DataFrame"):
         """
         Takes the data and returns a petri net by way of the alpha algorithm
         ---
-        :param log: event log to run the algorithm on 
+        :param log: event log, LogSummary, ColumnarLog or DataFrame (one row per event, with the columns
+            "case:concept:name", "concept:name" and optionally "time:timestamp") to run the algorithm on 
         :returns: petri net, inital marking, final marking
         """
-        self.net = PetriNet("Petri Net of G2 Alpha")
-        self.__init__(self.numberStartTokens, self.numberEndTokens)
-        self.__createLog(log)
-        self.__getStartAndEndEvents()
-        self.__addTransitions()
-        self.__addPlacesAndArcs()
-        self.__initialiseMarkings()
+        self.createCompactNet(log)
+        self.__exportPetriNet()
+        return self.net, self.initialMarking, self.finalMarking
+
+    @acceptsLogSummary
+    def createCompactNet(self, log: "EventLog | LogSummary | ColumnarLog | pd.DataFrame"):
+        """
+        Takes the data and returns a petri net by way of the alpha algorithm as CompactNet, without creating any
+        pm4py objects for it; getters that need the pm4py petri net export it when they are called
+        ---
+        :param log: event log, LogSummary, ColumnarLog or DataFrame to run the algorithm on
+        :returns: CompactNet with initial and final marking
+        """
+        startTime = time.perf_counter()
+        self.__init__(self.numberStartTokens, self.numberEndTokens, self.maxSetSize, self.workers, self.traceMemory,
+                      self.phaseCallback, self.sparse, self.timeLimit, self.maxCandidates)
+        if self.__usesWorkers() and not isinstance(log, (LogSummary, ColumnarLog, pd.DataFrame)):
+            self.__createLog(log)
+            with self.profiler.phase("summariseLogInParallel") as record:
+                self.__summariseLogInParallel()
+                record.sizes["activities"] = len(self.activityIsKey)
+                record.sizes["directlyFollowsPairs"] = self.__numberOfDirectlyFollowsPairs()
+        else:
+            self.__createLog(self.__summariseLog(log))
+            with self.profiler.phase("getStartAndEndEvents") as record:
+                self.__getStartAndEndEvents()
+                record.sizes["startActivities"] = len(self.startActivities)
+                record.sizes["endActivities"] = len(self.endActivities)
+            with self.profiler.phase("createFootPrintMatrixDicts") as record:
+                self.__createFootPrintMatrixDicts()
+                record.sizes["activities"] = len(self.activityIsKey)
+            with self.profiler.phase("createFootPrintMatrix") as record:
+                self.__createFootPrintMatrix()
+                record.sizes["directlyFollowsPairs"] = self.__numberOfDirectlyFollowsPairs()
+        self.__getPlacesAndArcs(startTime=startTime)
+        return self.compactNet
+
+    def update(self, newTraces):
+        """
+        Folds new traces into the directly-follows and footprint state of the last mined log and returns the petri
+        net for the grown log. Only the setDict rows whose footprint relations changed are calculated again; the
+        resulting petri net is the same as the one mined from scratch on the whole log. Rows left incomplete by the
+        limits of an earlier run are calculated again as well. The new traces are only merged into dataLog when the
+        log is requested, so an update does not go over the traces mined before
+        ---
+        :param newTraces: event log, LogSummary, ColumnarLog, DataFrame or list of traces that were added to the log
+        :returns: petri net, inital marking, final marking
+        """
+        if not self.activityIsKey:
+            return self.createPetriNet(newTraces)
+        startTime = time.perf_counter()
+        self.profiler.reset()
+        newLog = self.__summariseLog(newTraces)
+        newActivities = set(self.__getActivities(newLog)).difference(self.activityIsKey)
+        previousFootprintMatrix = self.__footprint()
+        if newActivities:
+            previousFootprintMatrix = self.__addActivities(newActivities)
+        sources, targets = self.__getDirectlyFollowsPairs(newLog)
+        self.__addDirectlyFollows(sources, targets)
+        self.__addStartAndEndEvents(self.__getStartActivities(newLog), self.__getEndActivities(newLog))
+        self.logUpdates.append(newLog)
+        changedRows = self.incompleteRows.union(self.__findChangedRows(previousFootprintMatrix))
+        self.__getPlacesAndArcs(sorted(changedRows), startTime)
+        self.__exportPetriNet()
         return self.net, self.initialMarking, self.finalMarking
     
     ####  GETTERS AND SETTERS  ###################################################################
     
     def getDataLog(self):
+        """
+        Returns the log as the algorithm keeps it, see dataLog; use getLogSummary for a result of a single type
+        """
+        self.__mergeLogUpdates()
         return self.dataLog
+
+    def getLogSummary(self) -> LogSummary:
+        """
+        Returns the log the petri net was mined from as LogSummary, whatever form it was given in; a ColumnarLog or
+        event log is summarised on every call
+        """
+        self.__mergeLogUpdates()
+        return self.__asLogSummary(self.dataLog)
    
     def getStartEvents(self):
+        if self.net is None:
+            self.__exportPetriNet()
         return self.startEvents
     
     def getEndEvents(self):
+        if self.net is None:
+            self.__exportPetriNet()
         return self.endEvents    
     
+    def getCompactNet(self):
+        return self.compactNet
+    
+    def getPetriNet(self):
+        if self.net is None:
+            self.__exportPetriNet()
+        return self.net
+    
     def getInitialMarking(self):
+        if self.net is None:
+            self.__exportPetriNet()
         return self.initialMarking
     
     def getFinalMarking(self):
+        if self.net is None:
+            self.__exportPetriNet()
         return self.finalMarking
        
+    def getDirectlyFollowsMatrix(self):
+        if self.directlyFollowsMatrix is None:
+            self.directlyFollowsMatrix, self.footprintMatrix = self.sparseFootprint.toDense()
+        return self.directlyFollowsMatrix
+       
     def getFootprintMatrix(self):
+        if self.footprintMatrix is None:
+            self.directlyFollowsMatrix, self.footprintMatrix = self.sparseFootprint.toDense()
         return self.footprintMatrix
     
+    def getSparseFootprint(self):
+        return self.sparseFootprint
+    
     def getActivityToTransition(self):
+        if self.net is None:
+            self.__exportPetriNet()
         return self.activityToTransition
     
     def getActivityIsKey(self):
@@ -94,59 +257,257 @@ class G2_AlphaAlgorithm:
     def getSetDict(self):
         return self.setDict   
     
+    def isEnumerationComplete(self):
+        return not self.incompleteRows
+    
+    def getConfiguration(self):
+        """
+        Returns the settings the mined petri net depends on, e.g. to key cached results
+        ---
+        :returns: python dictionary with format (key: setting, value: value), None if the result also depends on
+            the timing of the run (timeLimit is set)
+        """
+        if self.timeLimit is not None:
+            return None
+        return {"numberStartTokens": self.numberStartTokens, "numberEndTokens": self.numberEndTokens,
+                "maxSetSize": self.maxSetSize, "maxCandidates": self.maxCandidates}
+
+    def getPhaseTimings(self):
+        return self.profiler.getTimings()
+    
+    def getPhaseProfile(self):
+        return self.profiler.asDict()
+    
     ####  PRIVATE FUNCTIONS    ###################################################################        
             
-    def __createLog(self, log: EventLog):
+    def __createLog(self, log: "EventLog | LogSummary | ColumnarLog"):
         """
         Sets the provided event log
         ---
-        :params: log: event log
+        :params: log: event log, LogSummary or ColumnarLog
         :returns: NONE
         """
         self.dataLog = log
-        
-    def __addTransitions(self):
+
+    def __summariseLog(self, log) -> LogSummary | ColumnarLog:
         """
-        Extracts all distinct transitions from the event log, casts them to the appropriate format and adds 
-        them to the petri net. Also sorts the transitions and assigns each to an index, storing them in the 
-        dictionary activityToTransition
+        Summarises an event log (or list of traces) into a LogSummary and a DataFrame into a ColumnarLog, each in a
+        single pass, so that activities, start and end activities and directly-follows pairs are read from the
+        summary instead of scanning the log once for each of them
+        ---
+        :param log: event log, list of traces, DataFrame, LogSummary or ColumnarLog
+        :returns: LogSummary or ColumnarLog
+        """
+        if isinstance(log, (LogSummary, ColumnarLog)):
+            return log
+        with self.profiler.phase("summariseLog") as record:
+            if isinstance(log, pd.DataFrame):
+                summary = ColumnarLog.fromDataFrame(log)
+                record.sizes["cases"] = summary.numberOfCases()
+            else:
+                summary = LogSummary.fromEventLog(log)
+                record.sizes["cases"] = summary.numberOfCases
+                record.sizes["variants"] = len(summary.variantCounts)
+        return summary
+
+    def __mergeLogUpdates(self):
+        """
+        Merges the traces of the updates since the last call into dataLog, which then becomes a LogSummary
         ---
         :params: NONE
         :returns: NONE
         """
-        log_activities = pm4py.get_event_attribute_values(self.dataLog, "concept:name")
-        index = 0
-        for key in sorted(log_activities.keys()):
-            transition = PetriNet.Transition(key, key)
-            self.activityToTransition[index] = transition
-            self.net.transitions.add(transition)
-            index += 1
-            
+        if not self.logUpdates:
+            return
+        with self.profiler.phase("mergeLogUpdates") as record:
+            self.dataLog = LogSummary.merged(*map(self.__asLogSummary, [self.dataLog] + self.logUpdates))
+            record.sizes["updates"] = len(self.logUpdates)
+            record.sizes["variants"] = len(self.dataLog.variantCounts)
+        self.logUpdates = []
+
+    @staticmethod
+    def __asLogSummary(log: "EventLog | LogSummary | ColumnarLog") -> LogSummary:
+        if isinstance(log, LogSummary):
+            return log
+        if isinstance(log, ColumnarLog):
+            return log.toLogSummary()
+        return LogSummary.fromEventLog(log)
+
+    def __getActivities(self, log: LogSummary | ColumnarLog):
+        """
+        Extracts all distinct activities from a LogSummary or ColumnarLog
+        ---
+        :param log: LogSummary or ColumnarLog
+        :returns: list of activities
+        """
+        if isinstance(log, LogSummary):
+            return list(log.activities)
+        return [log.activities[code] for code in np.unique(log.activityCodes)]
+
+    def __getStartActivities(self, log: LogSummary | ColumnarLog):
+        if isinstance(log, LogSummary):
+            return log.getStartActivities().keys()
+        isCase = log.caseOffsets[:-1] < log.caseOffsets[1:]
+        return [log.activities[code] for code in np.unique(log.activityCodes[log.caseOffsets[:-1][isCase]])]
+
+    def __getEndActivities(self, log: LogSummary | ColumnarLog):
+        if isinstance(log, LogSummary):
+            return log.getEndActivities().keys()
+        isCase = log.caseOffsets[:-1] < log.caseOffsets[1:]
+        return [log.activities[code] for code in np.unique(log.activityCodes[log.caseOffsets[1:][isCase] - 1])]
+
+    def __getDirectlyFollowsPairs(self, log: LogSummary | ColumnarLog):
+        """
+        Extracts all directly-follows pairs from the directly-follows counts of a LogSummary or from the case-ordered
+        activity codes of a ColumnarLog, as arrays of activity numbers
+        ---
+        :param log: LogSummary or ColumnarLog
+        :returns: array of preceding activity numbers, array of following activity numbers
+        """
+        if isinstance(log, LogSummary):
+            activityNrs = np.array([self.activityIsKey[activity] for activity in log.activities], dtype=np.int32)
+            pairs = np.array(list(log.directlyFollowsCounts.keys()), dtype=np.int32).reshape(-1, 2)
+            return activityNrs[pairs[:, 0]], activityNrs[pairs[:, 1]]
+        # activities of the ColumnarLog that do not occur in an event are not in activityIsKey
+        activityNrs = np.array([self.activityIsKey.get(activity, -1) for activity in log.activities], dtype=np.int32)
+        sources, targets = directlyFollowsPairs(np.asarray(log.activityCodes), np.asarray(log.caseOffsets))
+        return activityNrs[sources], activityNrs[targets]
+        
     def __getStartAndEndEvents(self):
         """
-        Extracts all start events from the data, casts them into the transition format and adds them to 
-        the instance variable startEvents list. Does the same with all end events.
+        Extracts all start activities from the data and adds them to the instance variable startActivities list.
+        Does the same with all end activities; their transitions are only created when the petri net is exported
         ---
         :params: NONE
         :returns: NONE
         """
-        startEventsFromLog = pm4py.get_start_activities(self.dataLog).keys()
-        for key in startEventsFromLog:
-            self.startEvents.append(PetriNet.Transition(key, key))
-        endEventsFromLog = pm4py.get_end_activities(self.dataLog).keys()
-        for key in endEventsFromLog:
-            self.endEvents.append(PetriNet.Transition(key, key))
+        self.startActivities.extend(self.__getStartActivities(self.dataLog))
+        self.endActivities.extend(self.__getEndActivities(self.dataLog))
+
+    def __addStartAndEndEvents(self, startActivities, endActivities):
+        """
+        Adds the start and end activities of new traces to startActivities and endActivities, unless they are
+        already contained
+        ---
+        :param startActivities: start activities of the new traces
+        :param endActivities: end activities of the new traces
+        :returns: NONE
+        """
+        knownStartActivities = set(self.startActivities)
+        self.startActivities.extend(key for key in startActivities if key not in knownStartActivities)
+        knownEndActivities = set(self.endActivities)
+        self.endActivities.extend(key for key in endActivities if key not in knownEndActivities)
 
-    def __addPlacesAndArcs(self):
+    def __summariseLogInParallel(self):
         """
-        Calls methods to create the footprint matrix and add places and arcs (/flows) to the petri net
+        Extracts the start and end events, the dictionaries activityIsKey and indexIsKey and the footprint matrix
+        from partial summaries of the log, which are computed for shards of cases in worker processes
         ---
         :params: NONE
         :returns: NONE
-        """ 
-        self.__createFootPrintMatrixDicts()
-        self.__createFootPrintMatrix()
-        self.__getPlacesAndArcs()
+        """
+        log_activities, startEventsFromLog, endEventsFromLog, directlyFollows = summariseLog(self.dataLog, self.workers)
+        self.startActivities.extend(startEventsFromLog)
+        self.endActivities.extend(endEventsFromLog)
+        for index, event in enumerate(log_activities):
+            self.activityIsKey[event] = index
+            self.indexIsKey[index] = event
+        sources = np.array([self.activityIsKey[activity] for activity, _ in directlyFollows], dtype=np.int32)
+        targets = np.array([self.activityIsKey[activity] for _, activity in directlyFollows], dtype=np.int32)
+        self.__setDirectlyFollows(sources, targets)
+
+    def __setDirectlyFollows(self, sources: np.ndarray, targets: np.ndarray):
+        """
+        Creates the directly-follows and footprint matrices from the directly-follows pairs of the data, or only the
+        SparseFootprint in sparse mode
+        ---
+        :param sources: array of preceding activity numbers
+        :param targets: array of following activity numbers
+        :returns: NONE
+        """
+        if self.sparse:
+            self.sparseFootprint = SparseFootprint(sources, targets, len(self.activityIsKey))
+            self.directlyFollowsMatrix = None
+            self.footprintMatrix = None
+        else:
+            self.directlyFollowsMatrix = directlyFollowsMatrix(sources, targets, len(self.activityIsKey))
+            self.footprintMatrix = footprintFromDirectlyFollows(self.directlyFollowsMatrix)
+
+    def __addDirectlyFollows(self, sources: np.ndarray, targets: np.ndarray):
+        """
+        Adds directly-follows pairs of new traces to the directly-follows and footprint state
+        ---
+        :param sources: array of preceding activity numbers
+        :param targets: array of following activity numbers
+        :returns: NONE
+        """
+        if self.sparse:
+            self.sparseFootprint = self.sparseFootprint.withPairs(sources, targets)
+            self.directlyFollowsMatrix = None
+            self.footprintMatrix = None
+        else:
+            self.directlyFollowsMatrix[sources, targets] = True
+            self.footprintMatrix = footprintFromDirectlyFollows(self.directlyFollowsMatrix)
+
+    def __footprint(self):
+        return self.sparseFootprint if self.sparse else self.footprintMatrix
+
+    def __usesWorkers(self) -> bool:
+        # daemonic processes are not allowed to have children
+        return self.workers > 1 and not current_process().daemon
+
+    def __numberOfDirectlyFollowsPairs(self):
+        if self.sparse:
+            return len(self.sparseFootprint.pairCodes)
+        return int(self.directlyFollowsMatrix.sum())
+
+    def __addActivities(self, newActivities: set[str]) -> np.ndarray:
+        """
+        Adds activities to activityIsKey and indexIsKey while keeping the activities sorted; the directly-follows
+        matrix and the relations in rowRelations are moved to the new indices
+        ---
+        :param newActivities: activities that are not yet contained in activityIsKey
+        :returns: the former footprint matrix (or SparseFootprint), moved to the new indices
+        """
+        previousIndexIsKey = self.indexIsKey
+        log_activities = sorted(newActivities.union(self.activityIsKey))
+        self.activityIsKey = {event: index for index, event in enumerate(log_activities)}
+        self.indexIsKey = {index: event for index, event in enumerate(log_activities)}
+        newIndices = [self.activityIsKey[previousIndexIsKey[index]] for index in range(len(previousIndexIsKey))]
+        if self.sparse:
+            self.sparseFootprint = self.sparseFootprint.remapped(newIndices, len(log_activities))
+            previousFootprintMatrix = self.sparseFootprint
+        else:
+            movedIndices = np.ix_(newIndices, newIndices)
+            directlyFollows = np.zeros((len(log_activities), len(log_activities)), dtype=bool)
+            directlyFollows[movedIndices] = self.directlyFollowsMatrix
+            self.directlyFollowsMatrix = directlyFollows
+            previousFootprintMatrix = np.zeros((len(log_activities), len(log_activities)), dtype=self.footprintMatrix.dtype)
+            previousFootprintMatrix[movedIndices] = self.footprintMatrix
+        # the order of the activities is kept, so moved relations stay sorted
+        self.rowRelations = {(relationRole, newIndices[rowNr]): [tuple(newIndices[activityNr] for activityNr in relation)
+                                                                 for relation in relations]
+                             for (relationRole, rowNr), relations in self.rowRelations.items()}
+        self.incompleteRows = {newIndices[rowNr] for rowNr in self.incompleteRows}
+        return previousFootprintMatrix
+
+    def __findChangedRows(self, previousFootprintMatrix: np.ndarray) -> list[int]:
+        """
+        Finds the rows of the footprint matrix whose relations have to be calculated again: rows with a changed entry,
+        and rows in which the "choice" relation between two eligible activities changed
+        ---
+        :param previousFootprintMatrix: footprint matrix (or SparseFootprint) before the update, with the current indices
+        :returns: list of row numbers
+        """
+        if self.sparse:
+            return self.sparseFootprint.changedRows(previousFootprintMatrix)
+        changed = self.footprintMatrix != previousFootprintMatrix
+        changedRows = changed.any(axis=1)
+        for matrixValue in (1, -1):
+            eligible = self.footprintMatrix == matrixValue
+            for activityANr, activityBNr in np.argwhere(np.triu(changed, 1)):
+                changedRows |= eligible[:, activityANr] & eligible[:, activityBNr]
+        return np.flatnonzero(changedRows).tolist()
    
     def __createFootPrintMatrixDicts(self):
         """
@@ -155,7 +516,7 @@ class G2_AlphaAlgorithm:
         :params: NONE 
         :returns: NONE
         """
-        log_activities = list(pm4py.get_event_attribute_values(self.dataLog, "concept:name").keys())
+        log_activities = self.__getActivities(self.dataLog)
         log_activities.sort()
         index = 0
         for event in log_activities:
@@ -165,279 +526,178 @@ class G2_AlphaAlgorithm:
      
     def __createFootPrintMatrix(self):
         """
-        Creates the footprint matrix for the data
+        Creates the footprint matrix for the data; all directly-follows pairs are encoded as activity numbers, so
+        that the relations derived from them are computed with array operations
         ---
         :params: NONE
         :returns: NONE
         """ 
-        variants = pm4py.get_variants_as_tuples(self.dataLog)
-        self.footprintMatrix = np.zeros((len(self.activityIsKey), len(self.activityIsKey)))
-        for variant in variants.keys():
-            for eventnr in range(len(variant)):
-                activityNr = self.activityIsKey[variant[eventnr]]
-                if eventnr != (len(variant)-1):
-                    followingActivityNr = self.activityIsKey[variant[eventnr+1]]
-                    if self.footprintMatrix[activityNr][followingActivityNr] != 2:
-                        if (self.footprintMatrix[activityNr][followingActivityNr] == -1):
-                            self.footprintMatrix[activityNr][followingActivityNr] = 2 
-                        else:
-                            self.footprintMatrix[activityNr][followingActivityNr] = 1 
-                if eventnr != 0:
-                    previousActivityNr = self.activityIsKey[variant[eventnr-1]]
-                    if self.footprintMatrix[activityNr][previousActivityNr] != 2:
-                        if (self.footprintMatrix[activityNr][previousActivityNr] == 1):
-                            self.footprintMatrix[activityNr][previousActivityNr] = 2 
-                        else:
-                            self.footprintMatrix[activityNr][previousActivityNr] = -1
+        sources, targets = self.__getDirectlyFollowsPairs(self.dataLog)
+        self.__setDirectlyFollows(sources, targets)
             
-    def __getPlacesAndArcs(self):
+    def __getPlacesAndArcs(self, rowNrs=None, startTime=None):
         """
         Calls all methods necessary to extract Places and Arcs(/Flows) and add them to the petri net
         ---
-        :params: NONE
-        :returns: NONE
-        """
-        self.__fillSetDict()
-        self.__findSuperSets()
-        self.__removeSelfloops()
-        self.__createPlacesAndArcs()
-        self.__getStartAndEndPlacesAndArcs()
-        
-    def __isChoiceRelation(self, activityANr, activityBNr):
-        """
-        Checks if two activities (=parameters of the footprint matrix) are independent in the sense of the alpha algorithm
-        ---
-        :params: NONE
-        :returns: true if independent, false if not independent
-        """
-        return self.footprintMatrix[activityANr][activityBNr] == 0
-            
-    def __fillSetDict(self):
-        """
-        Calculates all possible sets offered by the footprint matrix and stores them in setDict
-        ---
-        :params: NONE
+        :param rowNrs: optional list of footprint rows whose sets are calculated again, all rows by default
+        :param startTime: time.perf_counter() value at the start of the run, which the time limit counts from
         :returns: NONE
         """
-        startRelations = self.__createRelationDict(1, "start")
-        endRelations = self.__createRelationDict(-1, "end")
-        self.setDict.update(startRelations)
-        self.setDict.update(endRelations)           
- 
-    def __createRelationDict(self, matrixValue: int, relationRole: str):
-        relationDict = dict()        
-        for rowNr in range(len(self.footprintMatrix)):
-            baseRelationSet: set[tuple] = set()
-            for columnNr in range(len(self.footprintMatrix)): 
-                if self.footprintMatrix[rowNr][columnNr] == matrixValue:
-                    baseRelationSet.add((columnNr,))
-            # in each row, get all possible relations of activity numbers in the column that are eligible for combination
-            rowRelationSet = self.__buildOrderedRelationSet(baseRelationSet)
-            for orderedRelation in rowRelationSet:
-                # depending on the role of the relation, append the row (activity) number to the beginning or to the end of the relation
-                if relationRole == "start":
-                    fromActivities = (rowNr,)
-                    toActivities = orderedRelation
-                else:
-                    fromActivities = orderedRelation
-                    toActivities = (rowNr,)
-                relationKey = fromActivities + toActivities
-                relationDict[relationKey] = relationRole
-        return relationDict
-    
-    def __buildOrderedRelationSet(self, baseRelationSet: set[tuple[int]]) -> set[tuple[int]]:
-            baseRelationList = list(baseRelationSet)
-            createdRelationSet: set[tuple[int]] = set()        
-            # try to merge every relation of the base relationset with every other relation in the set
-            for i, baseRelation in enumerate(baseRelationList):
-                for mergeRelation in baseRelationList[(i + 1):]:
-                    containsDependentPair = False
-                    # check every two relations if they can be merged;
-                    # if there is an activity of one relation that is not in a "choice" relation with an activity
-                    # of the other relation, the two relations cannot be merged
-                    for baseActivityNr in baseRelation:
-                        if containsDependentPair:
-                            break
-                        for compareActivityNr in mergeRelation:
-                            if not self.__isChoiceRelation(baseActivityNr, compareActivityNr):
-                                containsDependentPair = True
-                                break
-                    if not containsDependentPair:
-                        mergedSet = SortedSet(baseRelation + mergeRelation)
-                        createdRelationSet.add(tuple(mergedSet))
-            if len(createdRelationSet):
-                # if new relations were created by merging, try to merge those as well in a recursive manner
-                extendedRelationSet = self.__buildOrderedRelationSet(createdRelationSet)
-                extendedRelationSet.update(baseRelationSet)
-                return extendedRelationSet
-            return set(baseRelationList)
-    
-    def __findSuperSets(self):
+        budget = None
+        if self.timeLimit is not None or self.maxCandidates is not None:
+            budget = EnumerationBudget(self.timeLimit, self.maxCandidates, startTime)
+        with self.profiler.phase("fillSetDict") as record:
+            self.__fillSetDict(rowNrs, budget)
+            record.sizes["rows"] = len(self.activityIsKey) if rowNrs is None else len(rowNrs)
+            record.sizes["candidateRelations"] = len(self.setDict)
+            record.sizes["incompleteRows"] = len(self.incompleteRows)
+        with self.profiler.phase("findMaximalRelations") as record:
+            record.sizes["candidateRelations"] = len(self.setDict)
+            self.__findMaximalRelations()
+            record.sizes["maximalRelations"] = len(self.setDict)
+        with self.profiler.phase("assembleCompactNet") as record:
+            self.__assembleCompactNet()
+            record.sizes["transitions"] = len(self.compactNet.transitionNames)
+            record.sizes["places"] = len(self.compactNet.placeNames)
+            record.sizes["arcs"] = self.compactNet.numberOfArcs()
+
+    def __assembleCompactNet(self):
         """
-        Removes all sets that are not supersets from setDict
+        Builds the CompactNet from the activities, the entries in setDict and the start and end events: every entry
+        becomes a place that the activities before the anchor split produce tokens in and the activities after it
+        consume tokens from. The pm4py petri net of the last run is discarded, it is exported again on request
         ---
         :params: NONE
         :returns: NONE
         """
-        subsetKeys = []
-        for relation in self.setDict.keys():
-            if len(relation) > 2:
-                for relation2 in self.setDict.keys():
-                    if (relation == relation2):
-                        continue
-                    if set(relation).issuperset(set(relation2)):
-                        subsetKeys.append(relation2)            
-        for relation in set(subsetKeys):
-            self.setDict.pop(relation)
-    
-    def __removeSelfloops(self):
-        """
-        If a relation contains an activity that has a selfloop (e.g. A>A direct succession in trace log),
-        that activity is no more in a "choice" relation with itself, therefore the relation must be discarded
-        from the places
-        ---
-        :params: NONE 
-        :returns: NONE
-        """
-        loopRelations = set()
-        for relation in self.setDict.keys():
-            for activityNr in relation:
-                if not self.__isChoiceRelation(activityNr, activityNr):
-                    loopRelations.add(relation)
-                    break
-        for loopRelation in loopRelations:
-            self.setDict.pop(loopRelation)
-            
-    def __createPlacesAndArcs(self):
-        """
-        Creates Places and Arcs from the entries in setDict, adds the Places to the petri net
-        ---
-        :params: NONE 
-        :returns: NONE
-        """
-        for place, value in self.getSetDict().items():
-            if (value == "start"):
-                newPlace = self.__makeStartPlace(place)
-                self.net.places.add(newPlace)
-                self.__addArcsStart(place, newPlace)
-            elif (value == "end"):
-                newPlace = self.__makeEndPlace(place)
-                self.net.places.add(newPlace)
-                self.__addArcsEnd(place, newPlace)
+        activities = [self.indexIsKey[index] for index in range(len(self.indexIsKey))]
+        placeNames = []
+        producingPlaces, producingActivities, consumingPlaces, consumingActivities = [], [], [], []
+        for placeNr, (place, value) in enumerate(self.setDict.items()):
+            # the anchor activity is the first one of a "start" entry and the last one of an "end" entry
+            split = 1 if value == "start" else len(place) - 1
+            placeNames.append(self.__makePlaceName(place[:split], place[split:]))
+            producingPlaces.extend([placeNr] * split)
+            producingActivities.extend(place[:split])
+            consumingPlaces.extend([placeNr] * (len(place) - split))
+            consumingActivities.extend(place[split:])
+        startPlaceNr, endPlaceNr = len(placeNames), len(placeNames) + 1
+        placeNames.extend(["start", "end"])
+        consumingPlaces.extend([startPlaceNr] * len(self.startActivities))
+        consumingActivities.extend(self.activityIsKey[activity] for activity in self.startActivities)
+        producingPlaces.extend([endPlaceNr] * len(self.endActivities))
+        producingActivities.extend(self.activityIsKey[activity] for activity in self.endActivities)
+        initialMarking = np.zeros(len(placeNames), dtype=np.int32)
+        initialMarking[startPlaceNr] = self.numberStartTokens
+        finalMarking = np.zeros(len(placeNames), dtype=np.int32)
+        finalMarking[endPlaceNr] = self.numberEndTokens
+        self.compactNet = CompactNet(placeNames, activities, list(activities),
+                                     CompactNet.arcArray(consumingPlaces, consumingActivities),
+                                     CompactNet.arcArray(producingPlaces, producingActivities),
+                                     initialMarking, finalMarking)
+        self.net = None
 
-    def __makeStartPlace(self, place):
+    def __makePlaceName(self, inputActivityNrs, outputActivityNrs):
         """
-        Takes entry from set dict where the anchor activity is at the start and turns it into a Place
+        Creates the name of a place from the activities that produce and consume its tokens, e.g. ({'a'}, {'b', 'c'})
         ---
-        :param place: entry from setDict 
-        :returns: a Place
+        :param inputActivityNrs: activity numbers of the transitions producing tokens in the place
+        :param outputActivityNrs: activity numbers of the transitions consuming tokens from the place
+        :returns: place name
         """
-        placeString = "({'" + self.getIndexIsKey()[int(place[0])] + "'}, {'"
-        for task in range(1, len(place)):
-            if (task != 1):
-                placeString += "', '"
-            placeString += self.getIndexIsKey()[int(place[task])]
-        placeString += "'})"
-        newPlace = self.net.Place(placeString)
-        return newPlace
+        return ("({'" + "', '".join(self.indexIsKey[int(activityNr)] for activityNr in inputActivityNrs) + "'}, {'"
+                + "', '".join(self.indexIsKey[int(activityNr)] for activityNr in outputActivityNrs) + "'})")
 
-    def __makeEndPlace(self, place):
+    def __exportPetriNet(self):
         """
-        Takes entry from set dict where the anchor activity is at the end and turns it into a Place
-        ---
-        :param place: entry from setDict 
-        :returns: a Place
-        """ 
-        placeString = "({'"
-        for task in range(0, (len(place)-1)):
-            if (task != 0):
-                placeString += "', '"
-            placeString += self.getIndexIsKey()[int(place[task])]    
-        placeString += "'}, {'" + self.getIndexIsKey()[int(place[-1])] + "'})" 
-        newPlace = self.net.Place(placeString)
-        return newPlace    
-
-    def __addArcsStart(self, placeString, Place):
-        """
-        For a given setDict entry where the anchor activity is at the start, creates the corresponding arcs and 
-        adds them to the petri net
+        Converts compactNet to a petri net with initial and final marking, as defined by the pm4py library, and
+        stores its start and end place, the transition of every activity and the transitions of the start and end
+        activities; nothing is exported before a petri net was mined
         ---
-        :param placeString: a setDict entry
-        :param Place: a Place representing the setDict entry
+        :params: NONE
         :returns: NONE
-        """ 
-        petri_utils.add_arc_from_to(self.getActivityToTransition()[int(placeString[0])], Place, self.net)
-        for task in range(1, len(placeString)):
-             petri_utils.add_arc_from_to(Place, self.getActivityToTransition()[int(placeString[task])], self.net)
-
-    def __addArcsEnd(self, placeString, Place):
         """
-        For a given setDict entry where the anchor activity is at the end, creates the corresponding arcs and adds them to the petri net
-        ---
-        :param placeString: a setDict entry
-        :param Place: a Place representing the setDict entry
-        :returns: NONE
-        """ 
-        for task in range(0, (len(placeString)-1)):
-                petri_utils.add_arc_from_to(self.getActivityToTransition()[int(placeString[task])], Place, self.net) 
-        petri_utils.add_arc_from_to(Place, self.getActivityToTransition()[int(placeString[len(placeString)-1])], self.net)
+        if self.compactNet is None:
+            return
+        with self.profiler.phase("exportPetriNet"):
+            self.net, self.initialMarking, self.finalMarking = self.compactNet.toPetriNet()
+            places = {place.name: place for place in self.net.places}
+            self.start = places["start"]
+            self.end = places["end"]
+            transitions = {transition.name: transition for transition in self.net.transitions}
+            self.activityToTransition = {index: transitions[key] for index, key in self.indexIsKey.items()}
+            self.startEvents = [transitions[activity] for activity in self.startActivities]
+            self.endEvents = [transitions[activity] for activity in self.endActivities]
 
-    def __getStartAndEndPlacesAndArcs(self):
+    def __fillSetDict(self, rowNrs=None, budget=None):
         """
-        Adds the start Place to the petri net and calls method to create and add the corresponding arcs. Does the same for all the end Place.
+        Calculates all possible sets offered by the footprint matrix and stores them in setDict; if row numbers
+        are given, only the sets of these rows are calculated again and all other rows are taken from rowRelations
         ---
-        :params: NONE 
+        :param rowNrs: optional list of row numbers to calculate, all rows by default
+        :param budget: optional EnumerationBudget; rows are then calculated in this process, cheapest first, and rows
+            that were not completed before the budget was exhausted are added to incompleteRows
         :returns: NONE
-        """  
-        self.net.places.add(self.start)
-        self.__addStartArcs()
-        self.net.places.add(self.end)  
-        self.__addEndArcs()
-
-    def __addStartArcs(self):
         """
-        For all start events, adds arcs to the start Place to the petri net
+        if rowNrs is None:
+            rowNrs = range(len(self.activityIsKey))
+        footprint = self.__footprint()
+        if budget is not None:
+            self.__fillRowRelationsWithinBudget(footprint, rowNrs, budget)
+        elif self.__usesWorkers() and len(rowNrs) > 1:
+            self.rowRelations.update(enumerateRowRelations(footprint, rowNrs, self.maxSetSize, self.workers))
+        else:
+            for rowNr in rowNrs:
+                self.rowRelations[("start", rowNr)] = anchoredRelations(footprint, rowNr, 1, "start", self.maxSetSize)
+                self.rowRelations[("end", rowNr)] = anchoredRelations(footprint, rowNr, -1, "end", self.maxSetSize)
+        self.setDict = dict()
+        for relationRole in ("start", "end"):
+            for rowNr in range(len(self.activityIsKey)):
+                for relation in self.rowRelations.get((relationRole, rowNr), []):
+                    self.setDict[relation] = relationRole
+ 
+    def __fillRowRelationsWithinBudget(self, footprint, rowNrs, budget: EnumerationBudget):
+        """
+        Calculates the relations of the given rows until the budget is exhausted. The rows with the fewest eligible
+        activities come first: their enumeration is the cheapest and the least likely to explode, so the most places
+        are found within the budget. Every relation found is a maximal group of its row, so the places found so far
+        form a valid petri net
         ---
-        :params: NONE
+        :param footprint: footprint matrix or SparseFootprint
+        :param rowNrs: row numbers to calculate
+        :param budget: EnumerationBudget
         :returns: NONE
         """
-        for startEvent in self.startEvents:
-            for transition in self.activityToTransition.values():
-                if (str(startEvent) == str(transition)):
-                    petri_utils.add_arc_from_to(self.start, transition, self.net)             
+        if self.sparse:
+            pointers = (footprint.causalSuccessorPointers, footprint.causalPredecessorPointers)
+            numberOfCandidates = sum(np.diff(rowPointers) for rowPointers in pointers)
+        else:
+            numberOfCandidates = np.count_nonzero((footprint == 1) | (footprint == -1), axis=1)
+        for rowNr in sorted(rowNrs, key=lambda rowNr: numberOfCandidates[rowNr]):
+            if budget.isExhausted():
+                self.rowRelations[("start", rowNr)] = []
+                self.rowRelations[("end", rowNr)] = []
+                self.incompleteRows.add(rowNr)
+                continue
+            self.rowRelations[("start", rowNr)] = anchoredRelations(footprint, rowNr, 1, "start", self.maxSetSize, budget)
+            self.rowRelations[("end", rowNr)] = anchoredRelations(footprint, rowNr, -1, "end", self.maxSetSize, budget)
+            # the budget may have run out in the middle of the row
+            if budget.isExhausted():
+                self.incompleteRows.add(rowNr)
+            else:
+                self.incompleteRows.discard(rowNr)
 
-    def __addEndArcs(self):
+    def __findMaximalRelations(self):
         """
-        For all end events, adds arcs to the end Place to the petri net
+        Removes all sets that are not supersets from setDict, together with all sets that contain an activity with a
+        selfloop (e.g. A>A direct succession in trace log): such an activity is no more in a "choice" relation with
+        itself, therefore the relation must be discarded from the places. Both filters run in a single pass
         ---
         :params: NONE
         :returns: NONE
-        """  
-        for endEvent in self.endEvents:
-            for transition in self.activityToTransition.values():
-                if (str(endEvent) == str(transition)):
-                    petri_utils.add_arc_from_to(transition, self.end, self.net)
-
-    def __initialiseMarkings(self):
         """
-        Adds inital and final Markings to the petri net
-        ---
-        :params: NONE 
-        :returns: NONE
-        """ 
-        self.initialMarking[self.start] = self.numberStartTokens
-        self.finalMarking[self.end] = self.numberEndTokens
-    
-
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-
+        if self.sparse:
+            selfloopMask = bitmaskOf(self.sparseFootprint.selfloops().tolist())
+        else:
+            selfloopMask = bitmaskOf(np.flatnonzero(np.diagonal(self.footprintMatrix) != 0).tolist())
+        self.setDict = findMaximalRelations(self.setDict, selfloopMask)
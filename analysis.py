@@ -1,59 +1,177 @@
-import matplotlib.pyplot as plt
+import time
+
 import pandas as pd
-import pm4py
-from pm4py.objects.log.obj import EventLog
-from typing import Callable
+from typing import Callable, TYPE_CHECKING
+
+from analysisdata import AnalysisResult, AlgoData, RETAIN_ALL
+from analysisjobs import LogSource, job_timeout, run_jobs, split_algorithm_output
+from compactnet import CompactNet
+from logcache import ColumnarLog, LogCache
+from logsampling import LogSample, LogSampler
+from logsummary import LogSummary
+from netdiff import NetDiff, diffNets
+from resultcache import ResultCache, algorithm_configuration
+from xesstream import readLogSummary
 
-from analysisdata import AnalysisResult, AlgoData
+# pm4py is only imported where a full event log, its replay or its petri net objects are needed
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+    from pm4py.objects.log.obj import EventLog
 
 
 class Analysis:
     
-    def __init__(self, file_path: str, is_status_logging_on: bool = True):
-        self.log: EventLog = pm4py.read_xes(file_path)
+    def __init__(self, file_path: str | pd.DataFrame, is_status_logging_on: bool = True, streaming: bool = False,
+                 cache_dir: str | None = None, builtin_replay: bool = True, result_cache_dir: str | None = None,
+                 retention: str = RETAIN_ALL, sampler: LogSampler | None = None):
+        # in streaming and cached mode, only a LogSummary of the log is kept instead of a full EventLog;
+        # event tables (DataFrames, .csv and .parquet files) are read into columns without any pm4py objects.
+        # A full EventLog is summarised once as well, the summary is shared by all algorithms that accept it
+        # and by the replay of all runs
+        self.log: "EventLog | None" = None
+        self.log_summary: LogSummary | None = None
+        self.columnar_log: ColumnarLog | None = None
+        if isinstance(file_path, pd.DataFrame) or file_path.endswith((".csv", ".parquet")):
+            self.columnar_log = ColumnarLog.fromDataFrame(self.__read_event_table(file_path))
+            self.log_summary = self.columnar_log.toLogSummary()
+        elif cache_dir is not None:
+            self.columnar_log = LogCache(cache_dir).load(file_path)
+            self.log_summary = self.columnar_log.toLogSummary()
+        elif streaming:
+            self.log_summary = readLogSummary(file_path)
+        else:
+            import pm4py
+            self.log = pm4py.read_xes(file_path)
+            self.log_summary = LogSummary.fromEventLog(self.log)
+        # with a sampler, all algorithms mine and replay a sample of the cases instead of the whole log
+        self.log_sample: LogSample | None = None
+        if sampler is not None:
+            self.log_sample = sampler.sample(self.log_summary)
+            self.log, self.log_summary, self.columnar_log = None, self.log_sample.summary, None
+            if is_status_logging_on:
+                print(f"Sampled {self.log_sample.sampledCases} of {self.log_sample.totalCases} cases "
+                      f"({self.log_sample.sampledVariants} of {self.log_sample.totalVariants} variants), "
+                      f"footprint completeness confidence {self.log_sample.confidence:.3f}")
+        self.__log_source = LogSource(self.log, self.log_summary, self.columnar_log)
         self.algorithms: dict[str, AlgoData] = {}
         self.is_status_logging_on: bool = is_status_logging_on
+        # the built-in replay evaluates every variant once; pm4py replays the event log
+        self.builtin_replay: bool = builtin_replay
+        # results are reused across runs, repetitions and sessions for the same log, algorithm and configuration
+        self.result_cache: ResultCache | None = ResultCache(result_cache_dir) if result_cache_dir is not None else None
+        self.__log_fingerprint: str | None = None
+        # which nets the algorithms keep of their runs: all of them (identical nets are stored once), only the one
+        # of the first run, or none (fitness values and timings only), see analysisdata
+        self.retention: str = retention
+        # fingerprint of every net replayed so far with the name of its algorithm and its fitness; a structurally
+        # identical net of a later run has the same fitness, so it is not replayed again
+        self.__replayed_nets: dict[str, tuple[str, dict]] = {}
         
     def add_algo_function(self, algo_name: str, algo_function: Callable) -> None:
-        self.algorithms[algo_name] = AlgoData(algo_function)
+        self.algorithms[algo_name] = AlgoData(algo_function, self.retention)
         
     def add_algo_functions(self, algo_functions_with_names: list[(str, Callable)]) -> None:
-        self.algorithms.update({name: AlgoData(function) for name, function in algo_functions_with_names})
+        self.algorithms.update({name: AlgoData(function, self.retention) for name, function in algo_functions_with_names})
         
-    def run(self, stability_test_runs: int = 1) -> None:
+    def run(self, stability_test_runs: int = 1, workers: int = 1, timeout: float | None = None) -> None:
         run_times = stability_test_runs if stability_test_runs > 1 else 1
+        if workers > 1:
+            self.__run_parallel(run_times, workers, timeout)
+            return
         for name, algo in self.algorithms.items():  
             for i in range(run_times): 
                 run_status_text = f"{i + 1}/{run_times}" if run_times > 1 else ""
                 print(f"Running algo {name} {run_status_text}")
-                self.__log_status("- Building Petri net...")
-                net, init_marking, final_marking = algo.function(self.log)
-                self.__log_status("- Petri net completed")
-                self.__log_status("- Calculating replay fitness...")
-                fitness = pm4py.fitness_token_based_replay(self.log, net, init_marking, final_marking)
+                cache_key = self.__result_cache_key(name, algo)
+                cached_result = self.result_cache.load(cache_key) if cache_key is not None else None
+                if cached_result is not None:
+                    algo.add_result(*cached_result)
+                    self.__log_status("- Result loaded from cache\n")
+                    continue
+                try:
+                    with job_timeout(timeout):
+                        self.__log_status("- Building Petri net...")
+                        start_time = time.perf_counter()
+                        net, init_marking, final_marking = split_algorithm_output(
+                            algo.function(self.__log_source.algorithm_input(algo.function)))
+                        build_seconds = time.perf_counter() - start_time
+                        self.__log_status(f"- Petri net completed in {build_seconds:.3f} s")
+                        compact_net = net if isinstance(net, CompactNet) else CompactNet.fromPetriNet(
+                            net, init_marking, final_marking)
+                        net_fingerprint = compact_net.getFingerprint()
+                        self.__log_net_changes(algo, compact_net)
+                        if net_fingerprint in self.__replayed_nets:
+                            # no replay took place, so the run has no replay time (mean_seconds skips it)
+                            replayed_name, fitness = self.__replayed_nets[net_fingerprint]
+                            replay_seconds = None
+                            self.__log_status(f"- Petri net identical to one of {replayed_name}, replay fitness reused")
+                        else:
+                            self.__log_status("- Calculating replay fitness...")
+                            start_time = time.perf_counter()
+                            fitness = self.__log_source.replay_fitness(net, init_marking, final_marking,
+                                                                       self.builtin_replay)
+                            replay_seconds = time.perf_counter() - start_time
+                            self.__replayed_nets[net_fingerprint] = (name, fitness)
+                            self.__log_status(f"- Replay fitness calculated in {replay_seconds:.3f} s")
+                except TimeoutError as error:
+                    algo.add_failure(i, repr(error))
+                    print(f"- Algo {name} timed out after {timeout} s\n")
+                    continue
+                except Exception as error:
+                    # recorded like a failed job of the parallel mode, so the other algorithms and runs carry on
+                    algo.add_failure(i, repr(error))
+                    print(f"- Algo {name} run {i + 1} failed: {error!r}\n")
+                    continue
                 average_trace_fitness = fitness["average_trace_fitness"]
                 log_fitness = fitness["log_fitness"]
-                self.__log_status("- Replay fitness calculated")
-                algo.add_result(net, init_marking, final_marking, average_trace_fitness, log_fitness)
-                self.__log_status(f"- Algo finished\n")
+                algo.add_result(net, init_marking, final_marking, average_trace_fitness, log_fitness,
+                                build_seconds, replay_seconds, net_fingerprint)
+                if cache_key is not None:
+                    self.result_cache.store(cache_key, net, init_marking, final_marking, average_trace_fitness,
+                                            log_fitness, build_seconds, replay_seconds)
+                self.__log_status("- Algo finished\n")
             
     def get_simple_results(self) -> dict[str, AnalysisResult]:
-        return {name: algo_data.results[0] for name, algo_data in self.algorithms.items()}
+        return {name: algo_data.results[0] for name, algo_data in self.algorithms.items() if algo_data.results}
     
     def create_comparison_table(self) -> pd.DataFrame:
-        comparison_dict = {name: [results.average_trace_fitness, results.log_fitness] for name, results in self.get_simple_results().items()}
-        return pd.DataFrame(comparison_dict, index=["Avg trace fitness", "Log fitness"])
+        # the timings are averaged over all runs of an algorithm, the fitness values are the ones of its first run
+        comparison_dict = {name: [results.average_trace_fitness, results.log_fitness,
+                                  self.algorithms[name].mean_seconds("build_seconds"),
+                                  self.algorithms[name].mean_seconds("replay_seconds")]
+                           for name, results in self.get_simple_results().items()}
+        return pd.DataFrame(comparison_dict, index=["Avg trace fitness", "Log fitness", "Avg build time (s)",
+                                                    "Avg replay time (s)"])
     
+    def diff_nets(self, algo_name: str, other_algo_name: str, run_index: int = 0) -> NetDiff:
+        """
+        Compares the nets of two algorithms (of the same run) by their place signatures, without any replay
+        """
+        nets = []
+        for name in (algo_name, other_algo_name):
+            result = self.algorithms[name].results[run_index]
+            if result.net is None:
+                raise ValueError(f"the petri net of run {run_index + 1} of {name} was not retained")
+            nets.append(result.net if isinstance(result.net, CompactNet)
+                        else CompactNet.fromPetriNet(result.net, result.init_marking, result.final_marking))
+        return diffNets(*nets)
+
     def show_petri_nets(self) -> None:
+        import pm4py
         for name, result in self.get_simple_results().items():
             print(f"Algo {name}")
-            pm4py.view_petri_net(result.net, result.init_marking, result.final_marking)
+            if result.net is None:
+                print("- Petri net not retained")
+                continue
+            pm4py.view_petri_net(*result.petri_net())
         
     def show_stability_graphs(self) -> None:
         stability_tested_algorithms = {name: algo_data for name, algo_data in self.algorithms.items() if len(algo_data.results) > 1}
         if len(stability_tested_algorithms) < 1:
             print("Not enough data (number of reruns too low) for stability evaluation")
             return
+        # matplotlib is only loaded for plotting, so batch runs without graphs start faster
+        import matplotlib.pyplot as plt
         figure, axis = plt.subplots(len(stability_tested_algorithms), 2)
         figure.set_size_inches(9, len(stability_tested_algorithms) * 2.4)
         for i, algo in enumerate(stability_tested_algorithms.items()):
@@ -68,10 +186,14 @@ class Analysis:
         
     def export_pnml(self, file_path: str, algo_name: str) -> None:
         result = self.get_simple_results().get(algo_name)
-        pm4py.write_pnml(result.net, result.init_marking, result.final_marking, file_path)
+        if isinstance(result.net, CompactNet):
+            result.net.writePnml(file_path)
+        else:
+            import pm4py
+            pm4py.write_pnml(*result.petri_net(), file_path)
         self.__log_status(f"Export into {file_path} successful")
     
-    def __create_stability_graph(self, axis: plt.Axes, algo_data: AlgoData, value_attr_name: str, title: str) -> None:
+    def __create_stability_graph(self, axis: "plt.Axes", algo_data: AlgoData, value_attr_name: str, title: str) -> None:
         fitness_values = [result.__getattribute__(value_attr_name) for result in algo_data.results]
         x_values = [i for i in range(1, len(algo_data.results) + 1)]
         axis.set_title(title)
@@ -80,6 +202,62 @@ class Analysis:
         axis.set_xticks(x_values)
         axis.plot(x_values, fitness_values, marker="o", linestyle="none")
         
+    def __run_parallel(self, run_times: int, workers: int, timeout: float | None) -> None:
+        jobs = [(name, i) for name in self.algorithms for i in range(run_times)]
+        cache_keys = {name: self.__result_cache_key(name, self.algorithms[name]) for name in self.algorithms}
+        cached_results = {name: self.result_cache.load(key) for name, key in cache_keys.items() if key is not None}
+        # an algorithm without a cached result is run once in the pool before its other repetitions can be reused,
+        # so all repetitions of it are run as jobs
+        pending_jobs = [(name, i) for name, i in jobs if cached_results.get(name) is None]
+        print(f"Running {len(pending_jobs)} jobs of {len(self.algorithms)} algos on {workers} workers"
+              f" ({len(jobs) - len(pending_jobs)} results from cache)")
+        outcomes = dict(zip(pending_jobs, run_jobs([self.algorithms[name].function for name, _ in pending_jobs],
+                                                   self.__log_source, workers, timeout, self.builtin_replay)))
+        for name, i in jobs:
+            algo = self.algorithms[name]
+            outcome = outcomes.get((name, i), cached_results.get(name))
+            if isinstance(outcome, Exception):
+                algo.add_failure(i, repr(outcome))
+                print(f"- Algo {name} run {i + 1} failed: {outcome!r}")
+                continue
+            algo.add_result(*outcome)
+            if (name, i) in outcomes and cache_keys[name] is not None and name not in cached_results:
+                self.result_cache.store(cache_keys[name], *outcome)
+                cached_results[name] = outcome
+        self.__log_status("- All jobs finished\n")
+
+    def __result_cache_key(self, algo_name: str, algo: AlgoData) -> str | None:
+        if self.result_cache is None:
+            return None
+        configuration = algorithm_configuration(algo.function)
+        if configuration is None:
+            return None
+        if self.__log_fingerprint is None:
+            self.__log_fingerprint = self.log_summary.getFingerprint()
+        configuration["replay"] = "builtin" if self.builtin_replay else "pm4py"
+        return self.result_cache.key(self.__log_fingerprint, algo_name, configuration)
+
+    @staticmethod
+    def __read_event_table(file_path: str | pd.DataFrame) -> pd.DataFrame:
+        if isinstance(file_path, pd.DataFrame):
+            return file_path
+        if file_path.endswith(".parquet"):
+            return pd.read_parquet(file_path)
+        return pd.read_csv(file_path)
+
+    def __log_net_changes(self, algo: AlgoData, compact_net: CompactNet) -> None:
+        # the cheap structural comparison with the previous run shows unstable algorithms before any replay
+        if not self.is_status_logging_on or not algo.results or algo.results[-1].net is None:
+            return
+        previous = algo.results[-1]
+        previous_net = previous.net if isinstance(previous.net, CompactNet) else CompactNet.fromPetriNet(
+            previous.net, previous.init_marking, previous.final_marking)
+        net_diff = diffNets(previous_net, compact_net)
+        if not net_diff.isEmpty():
+            print(f"- Petri net differs from the previous run: {len(net_diff.addedPlaces)} places added, "
+                  f"{len(net_diff.removedPlaces)} removed, {len(net_diff.addedArcs)} arcs added, "
+                  f"{len(net_diff.removedArcs)} removed")
+
     def __log_status(self, message: str) -> None:
         if self.is_status_logging_on:
             print(message)
@@ -1,24 +1,87 @@
-from pm4py.objects.petri_net.obj import PetriNet, Marking
-from typing import Callable
+from typing import Callable, TYPE_CHECKING
+
+from compactnet import CompactNet
+
+if TYPE_CHECKING:
+    from pm4py.objects.petri_net.obj import PetriNet, Marking
+
+# retention policies of AlgoData: keep the net of every run, keep the net of the first run and the fingerprint of
+# the nets of the others, or keep the fitness values and timings only
+RETAIN_ALL = "all"
+RETAIN_FIRST = "first"
+RETAIN_METRICS = "metrics"
 
 
 class AnalysisResult:
-    
-    def __init__(self, net: PetriNet, init_marking: Marking, final_marking: Marking,
-                 avg_trace_fitness: float, log_fitness: float):
-        self.net: PetriNet = net
-        self.init_marking: Marking = init_marking
-        self.final_marking: Marking = final_marking
+
+    # a stability sweep keeps one result per run, so results carry no per-instance dictionary
+    __slots__ = ("net", "init_marking", "final_marking", "average_trace_fitness", "log_fitness", "build_seconds",
+                 "replay_seconds", "net_fingerprint")
+
+    def __init__(self, net: "PetriNet | CompactNet | None", init_marking: "Marking | None",
+                 final_marking: "Marking | None", avg_trace_fitness: float, log_fitness: float,
+                 build_seconds: float | None = None, replay_seconds: float | None = None,
+                 net_fingerprint: str | None = None):
+        # a CompactNet holds its markings itself and is only converted to pm4py objects when they are needed;
+        # the net is None if the retention policy of the algorithm did not keep it
+        self.net: "PetriNet | CompactNet | None" = net
+        self.init_marking: "Marking | None" = init_marking
+        self.final_marking: "Marking | None" = final_marking
         self.average_trace_fitness: float = avg_trace_fitness
         self.log_fitness: float = log_fitness
+        # wall times of building the petri net and of the replay fitness calculation
+        self.build_seconds: float | None = build_seconds
+        self.replay_seconds: float | None = replay_seconds
+        # structural hash of the net (CompactNet.getFingerprint), None if it was not computed
+        self.net_fingerprint: str | None = net_fingerprint
+
+    def petri_net(self) -> tuple["PetriNet", "Marking", "Marking"]:
+        if self.net is None:
+            raise ValueError("the petri net of this run was not retained")
+        if isinstance(self.net, CompactNet):
+            return self.net.toPetriNet()
+        return self.net, self.init_marking, self.final_marking
 
 
 class AlgoData:
-    
-    def __init__(self, algo_function: Callable):
+
+    def __init__(self, algo_function: Callable, retention: str = RETAIN_ALL):
+        if retention not in (RETAIN_ALL, RETAIN_FIRST, RETAIN_METRICS):
+            raise ValueError(f"unknown retention policy {retention!r}")
         self.function: Callable = algo_function
+        self.retention: str = retention
         self.results: list[AnalysisResult] = []
-        
-    def add_result(self, net: PetriNet, init_marking: Marking, final_marking: Marking, 
-                   avg_trace_fitness: float, log_fitness: float) -> None:
-        self.results.append(AnalysisResult(net, init_marking, final_marking, avg_trace_fitness, log_fitness))
\ No newline at end of file
+        self.failures: dict[int, str] = {}
+        # one net per distinct fingerprint, shared by all results with that fingerprint
+        self.__nets: dict[str, tuple] = {}
+
+    def add_result(self, net: "PetriNet | CompactNet", init_marking: "Marking | None",
+                   final_marking: "Marking | None", avg_trace_fitness: float, log_fitness: float,
+                   build_seconds: float | None = None, replay_seconds: float | None = None,
+                   net_fingerprint: str | None = None) -> None:
+        fingerprint = net_fingerprint
+        if fingerprint is None and self.retention != RETAIN_METRICS:
+            compact_net = net if isinstance(net, CompactNet) else CompactNet.fromPetriNet(net, init_marking,
+                                                                                          final_marking)
+            fingerprint = compact_net.getFingerprint()
+        if self.retention == RETAIN_METRICS or (self.retention == RETAIN_FIRST and self.results):
+            net, init_marking, final_marking = None, None, None
+        elif fingerprint is not None:
+            net, init_marking, final_marking = self.__nets.setdefault(fingerprint, (net, init_marking, final_marking))
+        self.results.append(AnalysisResult(net, init_marking, final_marking, avg_trace_fitness, log_fitness,
+                                           build_seconds, replay_seconds, fingerprint))
+
+    def mean_seconds(self, value_attr_name: str) -> float | None:
+        values = [getattr(result, value_attr_name) for result in self.results
+                  if getattr(result, value_attr_name) is not None]
+        return sum(values) / len(values) if values else None
+
+    def distinct_nets(self) -> int | None:
+        """
+        Returns the number of structurally different nets over all runs, None if no fingerprints were kept
+        """
+        fingerprints = {result.net_fingerprint for result in self.results}
+        return None if None in fingerprints else len(fingerprints)
+
+    def add_failure(self, run_index: int, message: str) -> None:
+        self.failures[run_index] = message
@@ -0,0 +1,178 @@
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import TimeoutError as PoolTimeoutError, get_context
+from typing import Callable, TYPE_CHECKING
+
+from compactnet import CompactNet
+from logcache import ColumnarLog
+from logsummary import LogSummary
+from tokenreplay import token_based_replay_fitness
+
+if TYPE_CHECKING:
+    from pm4py.objects.log.obj import EventLog
+    from pm4py.objects.petri_net.obj import PetriNet, Marking
+
+# log of a worker process, set once by the pool initializer instead of being pickled with every job
+_worker_log_source: "LogSource" = None
+# seconds the pool waits beyond the timeout of a job, e.g. for one stuck in native code that SIGALRM cannot interrupt
+TIMEOUT_GRACE_SECONDS = 5.0
+
+
+class LogSource:
+
+    def __init__(self, log: "EventLog | None" = None, log_summary: LogSummary | None = None,
+                 columnar_log: ColumnarLog | None = None):
+        """
+        The log an analysis runs on, as a full EventLog or as a LogSummary (optionally backed by a cached ColumnarLog)
+        """
+        self.log: "EventLog | None" = log
+        self.log_summary: LogSummary | None = log_summary
+        self.columnar_log: ColumnarLog | None = columnar_log
+        self.__variant_log: "EventLog | None" = None
+        self.__variant_counts: dict[tuple[str], int] | None = None
+
+    def algorithm_input(self, function: Callable) -> "EventLog | LogSummary":
+        if self.log_summary is not None and getattr(function, "acceptsLogSummary", False):
+            return self.log_summary
+        return self.event_log()
+
+    def event_log(self) -> "EventLog":
+        if self.log is not None:
+            return self.log
+        if self.__variant_log is None:
+            # one shared trace object per variant keeps the frequencies without materializing every case
+            self.__variant_log = self.log_summary.toEventLog()
+        return self.__variant_log
+
+    def variant_counts(self) -> dict[tuple[str], int]:
+        if self.__variant_counts is None:
+            if self.log_summary is not None:
+                self.__variant_counts = self.log_summary.getVariantsAsTuples()
+            else:
+                import pm4py
+                # depending on the pm4py version, a variant maps to its traces or to their number
+                self.__variant_counts = {variant: traces if isinstance(traces, int) else len(traces)
+                                         for variant, traces in pm4py.get_variants_as_tuples(self.log).items()}
+        return self.__variant_counts
+
+    def replay_fitness(self, net: "PetriNet | CompactNet", init_marking: "Marking | None",
+                       final_marking: "Marking | None", builtin_replay: bool = True) -> dict[str, float]:
+        if builtin_replay:
+            compact_net = net if isinstance(net, CompactNet) else CompactNet.fromPetriNet(net, init_marking, final_marking)
+            if compact_net.hasUniqueVisibleLabels():
+                return token_based_replay_fitness(self.variant_counts(), compact_net)
+        import pm4py
+        if isinstance(net, CompactNet):
+            net, init_marking, final_marking = net.toPetriNet()
+        return pm4py.fitness_token_based_replay(self.event_log(), net, init_marking, final_marking)
+
+    def __getstate__(self) -> dict:
+        # a cached log is sent as the path of its memory-mapped arrays, never as the arrays themselves
+        if self.columnar_log is not None and self.columnar_log.directory is not None:
+            return {"log": self.log, "log_summary": None, "columnar_dir": self.columnar_log.directory}
+        return {"log": self.log, "log_summary": self.log_summary, "columnar_dir": None}
+
+    def __setstate__(self, state: dict) -> None:
+        columnar_log = ColumnarLog.load(state["columnar_dir"]) if state["columnar_dir"] is not None else None
+        log_summary = columnar_log.toLogSummary() if columnar_log is not None else state["log_summary"]
+        self.__init__(state["log"], log_summary, columnar_log)
+
+
+@contextmanager
+def job_timeout(timeout: float | None):
+    """
+    Raises a TimeoutError in the block once timeout seconds have passed; only enforced on platforms with
+    interval timers (signal.setitimer) and in the main thread of a process, signal handlers cannot be installed
+    from other threads, so there the block runs without a timeout
+    """
+    if (timeout is None or not hasattr(signal, "setitimer")
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+    previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def split_algorithm_output(output: tuple | CompactNet) -> tuple:
+    """
+    Algorithm functions return a pm4py petri net with its initial and final marking, or a CompactNet, which holds
+    its markings itself
+    ---
+    :returns: net, initial marking (None for a CompactNet), final marking (None for a CompactNet)
+    """
+    if isinstance(output, CompactNet):
+        return output, None, None
+    return output
+
+
+def build_and_evaluate(function: Callable, log_source: LogSource, builtin_replay: bool = True) -> tuple:
+    """
+    Builds the petri net of an algorithm function and calculates its token-based replay fitness
+    ---
+    :returns: net, initial marking, final marking, average trace fitness, log fitness, build seconds, replay seconds
+    """
+    start_time = time.perf_counter()
+    net, init_marking, final_marking = split_algorithm_output(function(log_source.algorithm_input(function)))
+    build_seconds = time.perf_counter() - start_time
+    fitness = log_source.replay_fitness(net, init_marking, final_marking, builtin_replay)
+    replay_seconds = time.perf_counter() - start_time - build_seconds
+    return (net, init_marking, final_marking, fitness["average_trace_fitness"], fitness["log_fitness"],
+            build_seconds, replay_seconds)
+
+
+def run_jobs(functions: list[Callable], log_source: LogSource, workers: int, timeout: float | None = None,
+             builtin_replay: bool = True) -> list[tuple | Exception]:
+    """
+    Runs build_and_evaluate for every function in a process pool; the log is handed to every worker once.
+    Results are returned in the order of the functions; a job that failed or ran longer than timeout seconds
+    is returned as its exception. Jobs stop themselves after timeout seconds, and the pool gives up on those that
+    did not return by their deadline (a job stuck in native code or a worker that died) and is terminated, so the
+    whole run takes at most (timeout + TIMEOUT_GRACE_SECONDS) per round of workers jobs
+    """
+    results = []
+    with get_context().Pool(workers, initializer=_init_worker, initargs=(log_source,)) as pool:
+        # the workers load the log in parallel before their first job, which does not count towards the deadlines
+        pool.apply(_worker_ready)
+        pending = [pool.apply_async(_run_job, (function, timeout, builtin_replay)) for function in functions]
+        start_time = time.monotonic()
+        for job_nr, result in enumerate(pending):
+            wait_timeout = None
+            if timeout is not None:
+                # the pool hands out the jobs in order, so if every job returns within timeout plus the grace
+                # period, job_nr has finished by the end of its round
+                deadline = start_time + (job_nr // workers + 1) * (timeout + TIMEOUT_GRACE_SECONDS)
+                wait_timeout = max(0.0, deadline - time.monotonic())
+            try:
+                results.append(result.get(wait_timeout))
+            except PoolTimeoutError:
+                results.append(TimeoutError("job did not return by its deadline"))
+            except Exception as error:
+                results.append(error)
+        # workers that still run a job that was given up on are killed instead of waited for
+        pool.terminate()
+    return results
+
+
+def _init_worker(log_source: LogSource) -> None:
+    global _worker_log_source
+    _worker_log_source = log_source
+
+
+def _worker_ready() -> bool:
+    return _worker_log_source is not None
+
+
+def _run_job(function: Callable, timeout: float | None, builtin_replay: bool) -> tuple:
+    with job_timeout(timeout):
+        return build_and_evaluate(function, _worker_log_source, builtin_replay)
+
+
+def _raise_timeout(signal_number, frame):
+    raise TimeoutError("job exceeded its timeout")
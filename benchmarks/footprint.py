@@ -0,0 +1,79 @@
+"""
+Compares the former event-by-event footprint construction with the vectorized one on the bundled logs.
+
+Run from the repository root:  python -m benchmarks.footprint [log files...]
+"""
+import glob
+import sys
+import time
+
+import numpy as np
+import pm4py
+
+from footprint import encodeVariants, directlyFollowsPairs, directlyFollowsMatrix, footprintFromDirectlyFollows
+
+
+def legacyFootprintMatrix(variants, activityIsKey: dict[str, int]) -> np.ndarray:
+    """
+    Reference implementation: the footprint loop G2_AlphaAlgorithm used before vectorization
+    """
+    footprintMatrix = np.zeros((len(activityIsKey), len(activityIsKey)))
+    for variant in variants:
+        for eventnr in range(len(variant)):
+            activityNr = activityIsKey[variant[eventnr]]
+            if eventnr != (len(variant)-1):
+                followingActivityNr = activityIsKey[variant[eventnr+1]]
+                if footprintMatrix[activityNr][followingActivityNr] != 2:
+                    if (footprintMatrix[activityNr][followingActivityNr] == -1):
+                        footprintMatrix[activityNr][followingActivityNr] = 2
+                    else:
+                        footprintMatrix[activityNr][followingActivityNr] = 1
+            if eventnr != 0:
+                previousActivityNr = activityIsKey[variant[eventnr-1]]
+                if footprintMatrix[activityNr][previousActivityNr] != 2:
+                    if (footprintMatrix[activityNr][previousActivityNr] == 1):
+                        footprintMatrix[activityNr][previousActivityNr] = 2
+                    else:
+                        footprintMatrix[activityNr][previousActivityNr] = -1
+    return footprintMatrix
+
+
+def vectorizedFootprintMatrix(variants, activityIsKey: dict[str, int]) -> np.ndarray:
+    codes, offsets = encodeVariants(variants, activityIsKey)
+    sources, targets = directlyFollowsPairs(codes, offsets)
+    return footprintFromDirectlyFollows(directlyFollowsMatrix(sources, targets, len(activityIsKey)))
+
+
+def bestOf(function, repetitions: int) -> float:
+    timings = []
+    for _ in range(repetitions):
+        startTime = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - startTime)
+    return min(timings)
+
+
+def run(filePaths: list[str], repetitions: int = 5) -> None:
+    for filePath in filePaths:
+        log = pm4py.read_xes(filePath)
+        startTime = time.perf_counter()
+        variants = list(pm4py.get_variants_as_tuples(log).keys())
+        variantTime = time.perf_counter() - startTime
+        activities = sorted({activity for variant in variants for activity in variant})
+        activityIsKey = {activity: index for index, activity in enumerate(activities)}
+
+        legacy = legacyFootprintMatrix(variants, activityIsKey)
+        vectorized = vectorizedFootprintMatrix(variants, activityIsKey)
+        if not np.array_equal(legacy, vectorized):
+            raise AssertionError(f"Footprint matrices differ for {filePath}")
+
+        legacyTime = bestOf(lambda: legacyFootprintMatrix(variants, activityIsKey), repetitions)
+        vectorizedTime = bestOf(lambda: vectorizedFootprintMatrix(variants, activityIsKey), repetitions)
+        print(f"{filePath}: {len(variants)} variants, {len(activities)} activities")
+        print(f"- variant extraction: {variantTime * 1000:.1f} ms")
+        print(f"- legacy footprint:     {legacyTime * 1000:.2f} ms")
+        print(f"- vectorized footprint: {vectorizedTime * 1000:.2f} ms ({legacyTime / vectorizedTime:.1f}x)")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:] or sorted(glob.glob("logs/*.xes")) + sorted(glob.glob("logs/*.xes.gz")))
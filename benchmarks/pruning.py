@@ -0,0 +1,81 @@
+"""
+Compares the former size-sorted superset test of findMaximalRelations with the current one on logs whose place
+enumeration explodes (benchmarks.synthetic.generateMoonMoserLogSummary).
+
+Run from the repository root:  python -m benchmarks.pruning [numbers of triples...]
+"""
+import sys
+import time
+
+import numpy as np
+
+from G2_AlphaAlgorithm import G2_AlphaAlgorithm
+from benchmarks.synthetic import generateMoonMoserLogSummary
+from placeenumeration import bitmaskOf, findMaximalRelations
+
+
+def legacyFindMaximalRelations(relationDict: dict[tuple[int], str], selfloopMask: int) -> dict[tuple[int], str]:
+    """
+    Reference implementation: every relation with more than two activities is indexed under each of its activities,
+    sorted by size, and a relation is tested against the relations listed under its least frequent activity
+    """
+    bitmasks = {relation: bitmaskOf(relation) for relation in relationDict}
+    supersetIndex: dict[int, list[tuple[int, int, tuple[int]]]] = dict()
+    for relation, bitmask in bitmasks.items():
+        if len(relation) > 2:
+            for activityNr in relation:
+                supersetIndex.setdefault(activityNr, []).append((len(relation), bitmask, relation))
+    for candidates in supersetIndex.values():
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+    maximalRelations = dict()
+    for relation, role in relationDict.items():
+        bitmask = bitmasks[relation]
+        if bitmask & selfloopMask:
+            continue
+        candidates = min((supersetIndex.get(activityNr, []) for activityNr in relation), key=len)
+        isSubset = False
+        for size, candidateBitmask, candidate in candidates:
+            if size < len(relation):
+                break
+            if candidate != relation and candidateBitmask & bitmask == bitmask:
+                isSubset = True
+                break
+        if not isSubset:
+            maximalRelations[relation] = role
+    return maximalRelations
+
+
+def candidateRelations(numberOfTriples: int) -> tuple[dict[tuple[int], str], int]:
+    """
+    Enumerates the candidate relations of a Moon-Moser log with G2_AlphaAlgorithm, before they are pruned
+    ---
+    :returns: python dictionary with format (key: relation, value: arc anchor point), selfloop bitmask
+    """
+    algorithm = G2_AlphaAlgorithm(1, 1)
+    algorithm.createCompactNet(generateMoonMoserLogSummary(numberOfTriples))
+    relationDict = {relation: relationRole for (relationRole, rowNr), relations in algorithm.rowRelations.items()
+                    for relation in relations}
+    selfloopMask = bitmaskOf(np.flatnonzero(np.diagonal(algorithm.getFootprintMatrix()) != 0).tolist())
+    return relationDict, selfloopMask
+
+
+def timeOf(function) -> tuple[float, dict]:
+    startTime = time.perf_counter()
+    result = function()
+    return time.perf_counter() - startTime, result
+
+
+def run(triples: list[int]) -> None:
+    for numberOfTriples in triples:
+        relationDict, selfloopMask = candidateRelations(numberOfTriples)
+        legacyTime, legacy = timeOf(lambda: legacyFindMaximalRelations(relationDict, selfloopMask))
+        currentTime, current = timeOf(lambda: findMaximalRelations(relationDict, selfloopMask))
+        if legacy != current:
+            raise AssertionError(f"Maximal relations differ for {numberOfTriples} triples")
+        print(f"{numberOfTriples} triples: {len(relationDict)} candidate relations, {len(current)} maximal")
+        print(f"- legacy pruning:  {legacyTime:.3f} s")
+        print(f"- current pruning: {currentTime:.3f} s ({legacyTime / currentTime:.1f}x)")
+
+
+if __name__ == "__main__":
+    run([int(argument) for argument in sys.argv[1:]] or [6, 8, 9])
@@ -0,0 +1,104 @@
+"""
+Times G2_AlphaAlgorithm.createPetriNet phase by phase against pm4py.discover_petri_net_alpha on synthetic logs
+and on the bundled logs, records peak memory and writes the results as JSON.
+
+Run from the repository root:  python -m benchmarks.scaling [--quick] [--output benchmarks/results.json]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import pm4py
+
+from G2_AlphaAlgorithm import G2_AlphaAlgorithm
+from benchmarks.synthetic import generateLogSummary
+
+SCENARIOS = [
+    {"numberOfActivities": 10, "concurrencyWidth": 2, "choiceWidth": 2, "loopDensity": 0.0, "numberOfVariants": 50},
+    {"numberOfActivities": 20, "concurrencyWidth": 3, "choiceWidth": 3, "loopDensity": 0.05, "numberOfVariants": 200},
+    {"numberOfActivities": 40, "concurrencyWidth": 4, "choiceWidth": 4, "loopDensity": 0.05, "numberOfVariants": 1000},
+    {"numberOfActivities": 40, "concurrencyWidth": 2, "choiceWidth": 8, "loopDensity": 0.1, "numberOfVariants": 1000,
+     "numberOfCases": 20000},
+    {"numberOfActivities": 80, "concurrencyWidth": 6, "choiceWidth": 6, "loopDensity": 0.1, "numberOfVariants": 5000,
+     "numberOfCases": 50000},
+]
+QUICK_SCENARIOS = SCENARIOS[:2]
+
+
+def measure(function, repetitions: int) -> dict:
+    """
+    Returns the best wall time of a function over several runs and its peak memory in a separate traced run
+    """
+    timings = []
+    for _ in range(repetitions):
+        startTime = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - startTime)
+    tracemalloc.start()
+    try:
+        function()
+        _, peakMemory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "peakMemoryBytes": peakMemory}
+
+
+def benchmarkLog(name: str, log, repetitions: int) -> dict:
+    algorithm = G2_AlphaAlgorithm(1, 1)
+    phaseTimings = []
+
+    def runG2():
+        algorithm.createPetriNet(log)
+        phaseTimings.append(dict(algorithm.getPhaseTimings()))
+
+    g2Result = measure(runG2, repetitions)
+    # best time per phase over the timed runs (the traced run is left out)
+    g2Result["phases"] = {phase: min(timings[phase] for timings in phaseTimings[:repetitions])
+                          for phase in phaseTimings[0]}
+    g2Result["phaseSizes"] = {phase: record["sizes"] for phase, record in algorithm.getPhaseProfile().items()}
+    g2Result["places"] = len(algorithm.getCompactNet().placeNames)
+    g2Result["arcs"] = algorithm.getCompactNet().numberOfArcs()
+    alphaResult = measure(lambda: pm4py.discover_petri_net_alpha(log), repetitions)
+    return {"log": name, "cases": len(log), "activities": len(algorithm.getActivityIsKey()),
+            "g2Alpha": g2Result, "pm4pyAlpha": alphaResult}
+
+
+def gitRevision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scenarios: list[dict], logFiles: list[str], repetitions: int, output: str) -> dict:
+    results = []
+    for scenario in scenarios:
+        log = generateLogSummary(**scenario).toEventLog()
+        name = "synthetic " + ", ".join(f"{key}={value}" for key, value in scenario.items())
+        print(f"Benchmarking {name}")
+        results.append({**benchmarkLog(name, log, repetitions), "scenario": scenario})
+    for logFile in logFiles:
+        print(f"Benchmarking {logFile}")
+        results.append(benchmarkLog(logFile, pm4py.read_xes(logFile), repetitions))
+    report = {"revision": gitRevision(), "python": platform.python_version(), "pm4py": pm4py.__version__,
+              "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "repetitions": repetitions, "results": results}
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="only the small synthetic scenarios, no bundled logs")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--output", default="benchmarks/results.json")
+    arguments = parser.parse_args()
+    bundledLogs = [] if arguments.quick else sorted(glob.glob("logs/*.xes")) + sorted(glob.glob("logs/*.xes.gz"))
+    run(QUICK_SCENARIOS if arguments.quick else SCENARIOS, bundledLogs, arguments.repetitions, arguments.output)
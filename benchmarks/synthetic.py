@@ -0,0 +1,103 @@
+"""
+Synthetic event logs with a configurable amount of concurrency, choice, loops and variants.
+"""
+import random
+
+from logsummary import LogSummary
+
+
+def generateProcess(numberOfActivities: int, concurrencyWidth: int, choiceWidth: int, seed: int = 0) -> list[tuple[str, list[str]]]:
+    """
+    Splits the activities into a sequence of blocks: parallel blocks execute all their activities in any order,
+    choice blocks execute one of their activities and single blocks execute their only activity
+    ---
+    :param numberOfActivities: number of distinct activities
+    :param concurrencyWidth: number of activities in a parallel block
+    :param choiceWidth: number of activities in a choice block
+    :param seed: random seed
+    :returns: list of blocks, each a (kind, activities) tuple with kind "parallel", "choice" or "single"
+    """
+    randomGenerator = random.Random(seed)
+    activities = [f"activity {number:04d}" for number in range(numberOfActivities)]
+    blocks = []
+    position = 0
+    while position < len(activities):
+        kind = randomGenerator.choice(["parallel", "choice", "single"])
+        width = {"parallel": concurrencyWidth, "choice": choiceWidth, "single": 1}[kind]
+        blockActivities = activities[position:position + max(1, width)]
+        blocks.append((kind if len(blockActivities) > 1 else "single", blockActivities))
+        position += len(blockActivities)
+    return blocks
+
+
+def simulateTrace(blocks: list[tuple[str, list[str]]], loopDensity: float, randomGenerator: random.Random,
+                  loopLength: int = 3, maxLoops: int = 3) -> tuple[str]:
+    """
+    Plays out one trace of a process; after a block, the trace jumps back loopLength - 1 blocks with probability
+    loopDensity (at most maxLoops times per trace), so loops span several activities instead of single selfloops
+    """
+    trace = []
+    blockNr = 0
+    loops = 0
+    while blockNr < len(blocks):
+        kind, activities = blocks[blockNr]
+        if kind == "parallel":
+            trace.extend(randomGenerator.sample(activities, len(activities)))
+        elif kind == "choice":
+            trace.append(randomGenerator.choice(activities))
+        else:
+            trace.extend(activities)
+        if blockNr >= loopLength - 1 and loops < maxLoops and randomGenerator.random() < loopDensity:
+            blockNr -= loopLength - 1
+            loops += 1
+        else:
+            blockNr += 1
+    return tuple(trace)
+
+
+def generateLogSummary(numberOfActivities: int = 20, concurrencyWidth: int = 3, choiceWidth: int = 3,
+                       loopDensity: float = 0.05, numberOfVariants: int = 200, numberOfCases: int = 2000,
+                       seed: int = 0) -> LogSummary:
+    """
+    Generates a synthetic log: distinct traces are simulated until numberOfVariants variants exist (or no new
+    ones turn up), then the cases are spread over the variants following a Zipf-like distribution
+    ---
+    :returns: LogSummary of the synthetic log
+    """
+    randomGenerator = random.Random(seed)
+    blocks = generateProcess(numberOfActivities, concurrencyWidth, choiceWidth, seed)
+    variants = dict()
+    attempts = 0
+    while len(variants) < numberOfVariants and attempts < numberOfVariants * 50:
+        variants.setdefault(simulateTrace(blocks, loopDensity, randomGenerator), None)
+        attempts += 1
+    variants = list(variants)
+    weights = [1.0 / rank for rank in range(1, len(variants) + 1)]
+    counts = [1] * len(variants)
+    for variantNr in randomGenerator.choices(range(len(variants)), weights, k=max(0, numberOfCases - len(variants))):
+        counts[variantNr] += 1
+    summary = LogSummary()
+    for variant, count in zip(variants, counts):
+        summary.addVariant(tuple(map(summary.encode, variant)), count)
+    return summary
+
+
+def generateMoonMoserLogSummary(numberOfTriples: int = 8) -> LogSummary:
+    """
+    Generates a log whose place enumeration explodes: activity "a" is followed by 3 * numberOfTriples activities
+    that are pairwise parallel within their triple and in a "choice" relation with all others, so the choice graph
+    of the successors of "a" is a Moon-Moser graph with 3 ** numberOfTriples maximal groups (one activity per
+    triple), all of the same size
+    ---
+    :returns: LogSummary of the synthetic log
+    """
+    summary = LogSummary()
+    activities = [f"activity {number:04d}" for number in range(3 * numberOfTriples)]
+    for activity in activities:
+        summary.addTrace(["a", activity])
+    for tripleNr in range(numberOfTriples):
+        first, second, third = activities[3 * tripleNr:3 * tripleNr + 3]
+        for trace in ([first, second, third], [third, second, first], [second, first, third], [first, third],
+                      [third, first], [second, third]):
+            summary.addTrace(trace)
+    return summary
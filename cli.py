@@ -0,0 +1,256 @@
+"""
+Mines or compares event logs without a notebook: writes the petri nets as PNML and the metrics of every log as
+JSON or CSV. Directories are searched for .xes, .xes.gz, .csv and .parquet logs, which are processed by a shared
+pool of worker processes.
+
+    python cli.py mine logs/ --workers 4 --fitness
+    python cli.py compare logs/log_simple1_nonoise.xes --algorithms g2,alpha,inductive --metrics-format csv
+
+Only the standard library is imported at startup. mine loads numpy and pandas, but neither pm4py nor matplotlib;
+compare loads pm4py (and with it matplotlib) once a pm4py algorithm is selected or a net is replayed by pm4py.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from multiprocessing import get_context
+
+LOG_SUFFIXES = (".xes", ".xes.gz", ".csv", ".parquet")
+COMPARE_ALGORITHMS = ("g2", "alpha", "alpha_plus", "heuristics", "inductive")
+
+# options of the command, set once per worker process by the pool initializer
+_worker_options: argparse.Namespace | None = None
+
+
+def find_logs(paths: list[str]) -> list[str]:
+    """
+    Returns the given log files and the logs in the given directories (not recursive), each directory sorted by name
+    """
+    log_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            log_files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                    if name.endswith(LOG_SUFFIXES)))
+        else:
+            log_files.append(path)
+    return log_files
+
+
+def log_name(file_path: str) -> str:
+    name = os.path.basename(file_path)
+    for suffix in LOG_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def read_log(file_path: str):
+    """
+    Reads a log without pm4py: XES files are streamed into a LogSummary, event tables into a ColumnarLog
+    ---
+    :returns: LogSummary or ColumnarLog
+    """
+    if file_path.endswith((".csv", ".parquet")):
+        import pandas as pd
+        from logcache import ColumnarLog
+        frame = pd.read_parquet(file_path) if file_path.endswith(".parquet") else pd.read_csv(file_path)
+        return ColumnarLog.fromDataFrame(frame)
+    from xesstream import readLogSummary
+    return readLogSummary(file_path)
+
+
+def create_miner(options: argparse.Namespace):
+    from G2_AlphaAlgorithm import G2_AlphaAlgorithm
+    return G2_AlphaAlgorithm(options.start_tokens, options.end_tokens, options.max_set_size, sparse=options.sparse,
+                             timeLimit=options.time_limit, maxCandidates=options.max_candidates)
+
+
+def create_sampler(options: argparse.Namespace):
+    from logsampling import LogSampler
+    return LogSampler(options.sample, options.sample_patience, options.sample_max_cases)
+
+
+def mine_log(file_path: str, options: argparse.Namespace) -> list[dict]:
+    """
+    Mines one log with G2_AlphaAlgorithm and writes its petri net to the output directory
+    ---
+    :returns: list with one row of metrics
+    """
+    start_time = time.perf_counter()
+    log = read_log(file_path)
+    read_seconds = time.perf_counter() - start_time
+    sample = create_sampler(options).sample(log) if options.sample else None
+    if sample is not None:
+        log = sample.summary
+    miner = create_miner(options)
+    compact_net = miner.createCompactNet(log)
+    summary = miner.getLogSummary()
+    row = {"log": file_path, "algorithm": "g2", "cases": summary.numberOfCases, "events": summary.numberOfEvents,
+           "variants": len(summary.variantCounts), "activities": len(summary.activities),
+           "places": len(compact_net.placeNames), "transitions": len(compact_net.transitionNames),
+           "arcs": compact_net.numberOfArcs(), "enumeration_complete": miner.isEnumerationComplete(),
+           "read_seconds": read_seconds, "mine_seconds": sum(miner.getPhaseTimings().values())}
+    row.update({f"{phase}_seconds": seconds for phase, seconds in miner.getPhaseTimings().items()})
+    if sample is not None:
+        row.update({"total_cases": sample.totalCases, "total_variants": sample.totalVariants,
+                    "sample_confidence": sample.confidence, "sample_saturated": sample.saturated})
+    if options.fitness:
+        from tokenreplay import token_based_replay_fitness
+        fitness = token_based_replay_fitness(summary.getVariantsAsTuples(), compact_net)
+        row.update({"average_trace_fitness": fitness["average_trace_fitness"], "log_fitness": fitness["log_fitness"]})
+    pnml_path = os.path.join(options.output_dir, f"g2alpha_{log_name(file_path)}.pnml")
+    compact_net.writePnml(pnml_path)
+    row["pnml"] = pnml_path
+    return [row]
+
+
+def compare_log(file_path: str, options: argparse.Namespace) -> list[dict]:
+    """
+    Runs the selected algorithms on one log through Analysis and writes the petri net of every algorithm
+    ---
+    :returns: list with one row of metrics per algorithm
+    """
+    from analysis import Analysis
+    from analysisdata import RETAIN_FIRST
+    analysis = Analysis(file_path, is_status_logging_on=False, streaming=file_path.endswith((".xes", ".xes.gz")),
+                        result_cache_dir=options.result_cache, retention=RETAIN_FIRST,
+                        sampler=create_sampler(options) if options.sample else None)
+    analysis.add_algo_functions([(name, algorithm_function(name, options)) for name in options.algorithms])
+    analysis.run(options.stability_runs, timeout=options.timeout)
+    rows = []
+    for name, algo_data in analysis.algorithms.items():
+        row = {"log": file_path, "algorithm": name, "runs": len(algo_data.results), "failures": len(algo_data.failures)}
+        if analysis.log_sample is not None:
+            row.update({"sampled_cases": analysis.log_sample.sampledCases,
+                        "sample_confidence": analysis.log_sample.confidence})
+        if algo_data.results:
+            first_result = algo_data.results[0]
+            pnml_path = os.path.join(options.output_dir, f"{name}_{log_name(file_path)}.pnml")
+            analysis.export_pnml(pnml_path, name)
+            row.update({"average_trace_fitness": first_result.average_trace_fitness,
+                        "log_fitness": first_result.log_fitness,
+                        "build_seconds": algo_data.mean_seconds("build_seconds"),
+                        "replay_seconds": algo_data.mean_seconds("replay_seconds"),
+                        "distinct_nets": algo_data.distinct_nets(), "pnml": pnml_path})
+        rows.append(row)
+    return rows
+
+
+def algorithm_function(name: str, options: argparse.Namespace):
+    if name == "g2":
+        return create_miner(options).createCompactNet
+    import pm4py
+    return getattr(pm4py, f"discover_petri_net_{name}")
+
+
+def process_log(file_path: str, options: argparse.Namespace) -> list[dict]:
+    # a failing log is reported in the metrics, so an unattended batch carries on with the other logs
+    try:
+        return (compare_log if options.command == "compare" else mine_log)(file_path, options)
+    except Exception as error:
+        return [{"log": file_path, "error": repr(error)}]
+
+
+def process_logs(log_files: list[str], options: argparse.Namespace) -> list[dict]:
+    """
+    Processes the logs one after the other, or in a pool of options.workers processes that is shared by all logs
+    """
+    if options.workers <= 1 or len(log_files) <= 1:
+        rows = []
+        for file_path in log_files:
+            rows.extend(report(process_log(file_path, options)))
+        return rows
+    rows = []
+    with get_context().Pool(min(options.workers, len(log_files)), initializer=_init_worker,
+                            initargs=(options,)) as pool:
+        for log_rows in pool.imap(_process_log_in_worker, log_files):
+            rows.extend(report(log_rows))
+    return rows
+
+
+def report(rows: list[dict]) -> list[dict]:
+    for row in rows:
+        if "error" in row:
+            print(f"{row['log']}: failed with {row['error']}", file=sys.stderr)
+        else:
+            print(f"{row['log']} ({row['algorithm']}): {row.get('places', row.get('runs'))} "
+                  f"{'places' if 'places' in row else 'runs'}, written to {row.get('pnml')}")
+    return rows
+
+
+def write_metrics(rows: list[dict], metrics_path: str, metrics_format: str) -> None:
+    os.makedirs(os.path.dirname(metrics_path) or ".", exist_ok=True)
+    with open(metrics_path, "w", encoding="utf-8", newline="") as file:
+        if metrics_format == "json":
+            json.dump(rows, file, indent=2)
+            return
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_arguments(arguments: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    shared = argparse.ArgumentParser(add_help=False)
+    shared.add_argument("paths", nargs="+", help="log files and directories with logs")
+    shared.add_argument("--output-dir", default="exports", help="directory for the PNML files and the metrics")
+    shared.add_argument("--metrics-format", choices=("json", "csv"), default="json")
+    shared.add_argument("--metrics", help="path of the metrics file (default: OUTPUT_DIR/metrics.FORMAT)")
+    shared.add_argument("--workers", type=int, default=1, help="number of processes the logs are spread over")
+    shared.add_argument("--start-tokens", type=int, default=1)
+    shared.add_argument("--end-tokens", type=int, default=1)
+    shared.add_argument("--max-set-size", type=int)
+    shared.add_argument("--sparse", action="store_true", help="sparse footprint, for thousands of activities")
+    shared.add_argument("--time-limit", type=float, help="seconds after which the place enumeration stops")
+    shared.add_argument("--max-candidates", type=int, help="candidate relations after which the enumeration stops")
+    shared.add_argument("--sample", choices=("reservoir", "stratified"),
+                        help="mine (and replay) a sample of the cases that stops once the footprint saturates")
+    shared.add_argument("--sample-patience", type=int, default=200,
+                        help="sampled units without a new directly-follows relation after which sampling stops")
+    shared.add_argument("--sample-max-cases", type=int)
+    mine_parser = subparsers.add_parser("mine", parents=[shared], help="mine every log with G2_AlphaAlgorithm")
+    mine_parser.add_argument("--fitness", action="store_true", help="also calculate the token-based replay fitness")
+    compare_parser = subparsers.add_parser("compare", parents=[shared], help="compare algorithms on every log")
+    compare_parser.add_argument("--algorithms", default="g2,alpha",
+                                help=f"comma-separated selection of {', '.join(COMPARE_ALGORITHMS)}")
+    compare_parser.add_argument("--stability-runs", type=int, default=1)
+    compare_parser.add_argument("--timeout", type=float, help="seconds after which a run of an algorithm is stopped")
+    compare_parser.add_argument("--result-cache", help="directory of a result cache shared by all runs")
+    options = parser.parse_args(arguments)
+    if options.command == "compare":
+        options.algorithms = [name.strip() for name in options.algorithms.split(",") if name.strip()]
+        unknown = set(options.algorithms) - set(COMPARE_ALGORITHMS)
+        if unknown:
+            parser.error(f"unknown algorithms: {', '.join(sorted(unknown))}")
+    options.metrics = options.metrics or os.path.join(options.output_dir, f"metrics.{options.metrics_format}")
+    return options
+
+
+def main(arguments: list[str] | None = None) -> int:
+    options = parse_arguments(arguments)
+    log_files = find_logs(options.paths)
+    if not log_files:
+        print("No logs found", file=sys.stderr)
+        return 1
+    os.makedirs(options.output_dir, exist_ok=True)
+    rows = process_logs(log_files, options)
+    write_metrics(rows, options.metrics, options.metrics_format)
+    print(f"Metrics of {len(log_files)} logs written to {options.metrics}")
+    return 1 if any("error" in row for row in rows) else 0
+
+
+def _init_worker(options: argparse.Namespace) -> None:
+    global _worker_options
+    _worker_options = options
+
+
+def _process_log_in_worker(file_path: str) -> list[dict]:
+    return process_log(file_path, _worker_options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import uuid
+from typing import TYPE_CHECKING
+from xml.etree import ElementTree
+
+import numpy as np
+
+# pm4py is only loaded to convert from and to its petri nets, so mining and writing PNML files do not import it
+if TYPE_CHECKING:
+    from pm4py.objects.petri_net.obj import PetriNet, Marking
+
+
+class CompactNet:
+
+    def __init__(self, placeNames: list[str], transitionNames: list[str], transitionLabels: list[str | None],
+                 preArcs: np.ndarray, postArcs: np.ndarray, initialMarking: np.ndarray, finalMarking: np.ndarray):
+        """
+        Initialises a CompactNet, a petri net with integer place and transition ids whose arcs are stored as lists of
+        (place id, transition id, weight) rows, so its memory grows with the number of arcs instead of places times
+        transitions; an instance of CompactNet contains the following instance variables:
+        ---
+        :var placeNames: list of place names, the position of a place is its id
+        :var transitionNames: list of transition names, the position of a transition is its id
+        :var transitionLabels: list of transition labels (None for invisible transitions)
+        :var preArcs: int32 array (arcs x 3) with one row (place id, transition id, weight) per arc from a place to a
+            transition, sorted by place and transition (see arcArray)
+        :var postArcs: int32 array (arcs x 3) with one row (place id, transition id, weight) per arc from a transition
+            to a place, sorted the same way
+        :var initialMarking: int32 vector with the number of tokens per place in the initial marking
+        :var finalMarking: int32 vector with the number of tokens per place in the final marking
+        """
+        self.placeNames = placeNames
+        self.transitionNames = transitionNames
+        self.transitionLabels = transitionLabels
+        self.preArcs = preArcs
+        self.postArcs = postArcs
+        self.initialMarking = initialMarking
+        self.finalMarking = finalMarking
+
+    @classmethod
+    def fromPetriNet(cls, net: "PetriNet", initialMarking: "Marking", finalMarking: "Marking") -> "CompactNet":
+        """
+        Converts a pm4py petri net; places and transitions are numbered in the order of their names
+        ---
+        :param net: petri net, as defined by the pm4py library
+        :param initialMarking: initial marking, as defined by the pm4py library
+        :param finalMarking: final marking, as defined by the pm4py library
+        :returns: CompactNet
+        """
+        places = sorted(net.places, key=lambda place: str(place.name))
+        transitions = sorted(net.transitions, key=lambda transition: (str(transition.name), str(transition.label)))
+        placeIds = {place: placeId for placeId, place in enumerate(places)}
+        transitionIds = {transition: transitionId for transitionId, transition in enumerate(transitions)}
+        preArcs, postArcs = [], []
+        for arc in net.arcs:
+            if arc.source in placeIds:
+                preArcs.append((placeIds[arc.source], transitionIds[arc.target], arc.weight))
+            else:
+                postArcs.append((placeIds[arc.target], transitionIds[arc.source], arc.weight))
+        return cls([str(place.name) for place in places],
+                   [str(transition.name) for transition in transitions],
+                   [transition.label for transition in transitions],
+                   cls.arcArray(*np.array(preArcs, dtype=np.int64).reshape(-1, 3).T),
+                   cls.arcArray(*np.array(postArcs, dtype=np.int64).reshape(-1, 3).T),
+                   cls.__markingVector(initialMarking, placeIds), cls.__markingVector(finalMarking, placeIds))
+
+    @staticmethod
+    def arcArray(placeIds, transitionIds, weights=None) -> np.ndarray:
+        """
+        Builds the arc rows of preArcs or postArcs: sorted by place and transition, with the weights of repeated
+        (place, transition) pairs added up
+        ---
+        :param placeIds: sequence of place ids, one per arc
+        :param transitionIds: sequence of transition ids, one per arc
+        :param weights: optional sequence of arc weights, 1 for every arc by default
+        :returns: int32 array (arcs x 3) of (place id, transition id, weight)
+        """
+        placeIds = np.asarray(placeIds, dtype=np.int64)
+        transitionIds = np.asarray(transitionIds, dtype=np.int64)
+        weights = np.ones(len(placeIds), dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        pairs, positions = np.unique(np.stack([placeIds, transitionIds], axis=1).reshape(-1, 2), axis=0,
+                                     return_inverse=True)
+        return np.column_stack([pairs, np.bincount(positions.ravel(), weights, len(pairs))]).astype(np.int32)
+
+    def preIncidence(self) -> np.ndarray:
+        """
+        Returns the dense int32 matrix (places x transitions) with the number of tokens a transition consumes from
+        a place; it needs memory for every pair of place and transition, so it is only built for the replay
+        """
+        return self.__incidence(self.preArcs)
+
+    def postIncidence(self) -> np.ndarray:
+        """
+        Returns the dense int32 matrix (places x transitions) with the number of tokens a transition produces in
+        a place
+        """
+        return self.__incidence(self.postArcs)
+
+    def toPetriNet(self, name: str = "") -> tuple["PetriNet", "Marking", "Marking"]:
+        """
+        Converts the CompactNet to pm4py objects, e.g. for visualising or for algorithms that need a pm4py petri net
+        ---
+        :param name: name of the petri net
+        :returns: petri net, initial marking, final marking, as defined by the pm4py library
+        """
+        from pm4py.objects.petri_net.obj import PetriNet, Marking
+        from pm4py.objects.petri_net.utils import petri_utils
+        net = PetriNet(name)
+        places = [PetriNet.Place(placeName) for placeName in self.placeNames]
+        transitions = [PetriNet.Transition(transitionName, label)
+                       for transitionName, label in zip(self.transitionNames, self.transitionLabels)]
+        net.places.update(places)
+        net.transitions.update(transitions)
+        for placeId, transitionId, weight in self.preArcs.tolist():
+            petri_utils.add_arc_from_to(places[placeId], transitions[transitionId], net, weight)
+        for placeId, transitionId, weight in self.postArcs.tolist():
+            petri_utils.add_arc_from_to(transitions[transitionId], places[placeId], net, weight)
+        initialMarking = Marking({places[placeId]: int(self.initialMarking[placeId])
+                                  for placeId in np.flatnonzero(self.initialMarking)})
+        finalMarking = Marking({places[placeId]: int(self.finalMarking[placeId])
+                                for placeId in np.flatnonzero(self.finalMarking)})
+        return net, initialMarking, finalMarking
+
+    def writePnml(self, filePath: str, name: str = "") -> None:
+        """
+        Writes the CompactNet with its markings to a PNML file in the layout of pm4py.write_pnml (places and
+        transitions are identified by their names, invisible transitions are marked as in ProM), without pm4py
+        ---
+        :param filePath: path of the PNML file
+        :param name: name of the petri net
+        :returns: NONE
+        """
+        root = ElementTree.Element("pnml")
+        net = ElementTree.SubElement(root, "net", {"id": "net1",
+                                                    "type": "http://www.pnml.org/version-2009/grammar/pnmlcoremodel"})
+        ElementTree.SubElement(ElementTree.SubElement(net, "name"), "text").text = name
+        page = ElementTree.SubElement(net, "page", {"id": "n0"})
+        for placeId, placeName in enumerate(self.placeNames):
+            place = ElementTree.SubElement(page, "place", {"id": placeName})
+            ElementTree.SubElement(ElementTree.SubElement(place, "name"), "text").text = placeName
+            if self.initialMarking[placeId]:
+                ElementTree.SubElement(ElementTree.SubElement(place, "initialMarking"), "text").text = \
+                    str(int(self.initialMarking[placeId]))
+        for transitionName, label in zip(self.transitionNames, self.transitionLabels):
+            transition = ElementTree.SubElement(page, "transition", {"id": transitionName})
+            ElementTree.SubElement(ElementTree.SubElement(transition, "name"), "text").text = \
+                transitionName if label is None else label
+            if label is None:
+                # derived from the name instead of random as in pm4py, so the same net always gives the same file
+                nodeId = str(uuid.uuid5(uuid.NAMESPACE_URL, transitionName))
+                ElementTree.SubElement(transition, "toolspecific", {"tool": "ProM", "version": "6.4",
+                                                                    "activity": "$invisible$", "localNodeID": nodeId})
+        arcs = [(self.placeNames[placeId], self.transitionNames[transitionId], weight)
+                for placeId, transitionId, weight in self.preArcs.tolist()]
+        arcs += [(self.transitionNames[transitionId], self.placeNames[placeId], weight)
+                 for placeId, transitionId, weight in self.postArcs.tolist()]
+        for arcNr, (source, target, weight) in enumerate(arcs):
+            arc = ElementTree.SubElement(page, "arc", {"id": f"arc{arcNr}", "source": source, "target": target})
+            if weight > 1:
+                ElementTree.SubElement(ElementTree.SubElement(arc, "inscription"), "text").text = str(weight)
+        if self.finalMarking.any():
+            marking = ElementTree.SubElement(ElementTree.SubElement(net, "finalmarkings"), "marking")
+            for placeId in np.flatnonzero(self.finalMarking).tolist():
+                ElementTree.SubElement(ElementTree.SubElement(marking, "place", {"idref": self.placeNames[placeId]}),
+                                       "text").text = str(int(self.finalMarking[placeId]))
+        tree = ElementTree.ElementTree(root)
+        ElementTree.indent(tree)
+        tree.write(filePath, encoding="utf-8", xml_declaration=True)
+
+    def save(self, filePath: str) -> None:
+        """
+        Writes the CompactNet with its markings to a compressed numpy archive
+        ---
+        :param filePath: path of the archive
+        :returns: NONE
+        """
+        with open(filePath, "wb") as file:
+            np.savez_compressed(file, placeNames=np.array(self.placeNames, dtype=np.str_),
+                                transitionNames=np.array(self.transitionNames, dtype=np.str_),
+                                transitionLabels=np.array(["" if label is None else label
+                                                           for label in self.transitionLabels], dtype=np.str_),
+                                invisible=np.array([label is None for label in self.transitionLabels], dtype=bool),
+                                preArcs=self.preArcs, postArcs=self.postArcs,
+                                initialMarking=self.initialMarking, finalMarking=self.finalMarking)
+
+    @classmethod
+    def load(cls, filePath: str) -> "CompactNet":
+        """
+        Reads a CompactNet written by save
+        ---
+        :param filePath: path of the archive
+        :returns: CompactNet
+        """
+        with np.load(filePath) as archive:
+            labels = [None if invisible else label
+                      for label, invisible in zip(archive["transitionLabels"].tolist(), archive["invisible"].tolist())]
+            if "preArcs" in archive:
+                preArcs, postArcs = archive["preArcs"], archive["postArcs"]
+            else:
+                # archives written before the arcs were stored sparsely hold the incidence matrices
+                preArcs, postArcs = (cls.arcArray(*np.nonzero(incidence), incidence[np.nonzero(incidence)])
+                                     for incidence in (archive["preIncidence"], archive["postIncidence"]))
+            return cls(archive["placeNames"].tolist(), archive["transitionNames"].tolist(), labels, preArcs, postArcs,
+                       archive["initialMarking"], archive["finalMarking"])
+
+    def numberOfArcs(self) -> int:
+        return len(self.preArcs) + len(self.postArcs)
+
+    def getFingerprint(self) -> str:
+        """
+        Returns a hash of the structure of the net that does not depend on place names or on the order of places
+        and transitions: every place is described by the transitions it consumes from and produces for (with arc
+        weights) and its tokens in the initial and final marking. Transitions are identified by their label, or by
+        name and label if they are invisible or share their label, so nets that differ only in place names get the
+        same fingerprint
+        ---
+        :returns: hexadecimal sha256 digest
+        """
+        labelCounts = dict()
+        for label in self.transitionLabels:
+            labelCounts[label] = labelCounts.get(label, 0) + 1
+        transitionKeys = [label if label is not None and labelCounts[label] == 1 else f"{name}|{label}"
+                          for name, label in zip(self.transitionNames, self.transitionLabels)]
+
+        placeArcs = [[[], [], int(initialTokens), int(finalTokens)]
+                     for initialTokens, finalTokens in zip(self.initialMarking.tolist(), self.finalMarking.tolist())]
+        for side, arcs in enumerate((self.preArcs, self.postArcs)):
+            for placeId, transitionId, weight in arcs.tolist():
+                placeArcs[placeId][side].append([transitionKeys[transitionId], weight])
+        for place in placeArcs:
+            place[0].sort()
+            place[1].sort()
+        places = sorted(placeArcs)
+        structure = json.dumps([sorted(transitionKeys), places], ensure_ascii=False)
+        return hashlib.sha256(structure.encode("utf-8")).hexdigest()
+
+    def hasUniqueVisibleLabels(self) -> bool:
+        """
+        Checks if every transition is visible and has a label no other transition has
+        """
+        return None not in self.transitionLabels and len(set(self.transitionLabels)) == len(self.transitionLabels)
+
+    def __incidence(self, arcs: np.ndarray) -> np.ndarray:
+        incidence = np.zeros((len(self.placeNames), len(self.transitionNames)), dtype=np.int32)
+        incidence[arcs[:, 0], arcs[:, 1]] = arcs[:, 2]
+        return incidence
+
+    @staticmethod
+    def __markingVector(marking: "Marking", placeIds: dict) -> np.ndarray:
+        vector = np.zeros(len(placeIds), dtype=np.int32)
+        for place, tokens in marking.items():
+            vector[placeIds[place]] = tokens
+        return vector
@@ -0,0 +1,85 @@
+import os
+import shutil
+from typing import Callable
+
+
+class DirectoryCache:
+
+    def __init__(self, cacheDir: str, maxSizeBytes: int, markerFile: str):
+        """
+        Directory of cache entries with one subdirectory per key, shared by LogCache and ResultCache: an entry is
+        written to a temporary directory and renamed when it is complete, and the least recently used entries are
+        evicted once the cache grows beyond maxSizeBytes
+        ---
+        :param cacheDir: directory to store the cache entries in
+        :param maxSizeBytes: maximum total size of all cache entries
+        :param markerFile: file every complete entry contains; directories without it are not entries
+        """
+        self.cacheDir: str = cacheDir
+        self.maxSizeBytes: int = maxSizeBytes
+        self.markerFile: str = markerFile
+
+    def entryDir(self, key: str) -> str:
+        return os.path.join(self.cacheDir, key)
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.entryDir(key), self.markerFile))
+
+    def touch(self, key: str) -> None:
+        """
+        Marks an entry as used, so it is evicted after the entries that were used less recently
+        """
+        os.utime(self.entryDir(key))
+
+    def write(self, key: str, writeEntry: Callable[[str], None]) -> None:
+        """
+        Stores an entry, replacing an existing one of the key, and evicts the least recently used other entries
+        ---
+        :param key: key of the entry
+        :param writeEntry: function that writes the files of the entry, including the marker file, into the
+            directory it is called with
+        :returns: NONE
+        """
+        entryDir = self.entryDir(key)
+        # entries are written to a temporary directory first, so an interrupted write never becomes a cache hit
+        temporaryDir = f"{entryDir}.{os.getpid()}.tmp"
+        os.makedirs(temporaryDir, exist_ok=True)
+        writeEntry(temporaryDir)
+        shutil.rmtree(entryDir, ignore_errors=True)
+        try:
+            os.replace(temporaryDir, entryDir)
+        except OSError:
+            # another process stored the same entry in the meantime
+            shutil.rmtree(temporaryDir, ignore_errors=True)
+        self.evict(keep=key)
+
+    def invalidate(self, isStale: Callable[[str], bool] | None = None) -> None:
+        """
+        Removes the entries whose directory isStale returns true for, or all entries if no function is given
+        """
+        for entryDir in self.entryDirs():
+            if isStale is None or isStale(entryDir):
+                shutil.rmtree(entryDir, ignore_errors=True)
+
+    def evict(self, keep: str | None = None) -> None:
+        """
+        Removes the least recently used entries until the cache is not larger than maxSizeBytes
+        """
+        entries = [(os.path.getmtime(entryDir), self.__size(entryDir), entryDir) for entryDir in self.entryDirs()]
+        totalSize = sum(size for _, size, _ in entries)
+        for _, size, entryDir in sorted(entries):
+            if totalSize <= self.maxSizeBytes:
+                break
+            if os.path.basename(entryDir) == keep:
+                continue
+            shutil.rmtree(entryDir, ignore_errors=True)
+            totalSize -= size
+
+    def entryDirs(self) -> list[str]:
+        if not os.path.isdir(self.cacheDir):
+            return []
+        return [os.path.join(self.cacheDir, name) for name in os.listdir(self.cacheDir)
+                if os.path.exists(os.path.join(self.cacheDir, name, self.markerFile))]
+
+    def __size(self, entryDir: str) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(entryDir) if entry.is_file())
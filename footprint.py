@@ -0,0 +1,186 @@
+import numpy as np
+
+
+def encodeVariants(variants, activityIsKey: dict[str, int]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Turns variants of activity names into one flat array of activity codes plus the offset at which every variant starts
+    ---
+    :param variants: iterable of variants, each variant being a tuple of activity names
+    :param activityIsKey: python dictionary with format (key: activity, value: index)
+    :returns: int32 array of activity codes, int64 array of variant offsets (one entry more than there are variants)
+    """
+    codes: list[int] = []
+    offsets = [0]
+    for variant in variants:
+        codes.extend(map(activityIsKey.__getitem__, variant))
+        offsets.append(len(codes))
+    return np.array(codes, dtype=np.int32), np.array(offsets, dtype=np.int64)
+
+
+def directlyFollowsPairs(codes: np.ndarray, offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds all directly-follows pairs of the encoded variants at once; pairs that would cross the border
+    between two variants are dropped
+    ---
+    :param codes: flat array of activity codes, as returned by encodeVariants
+    :param offsets: variant offsets, as returned by encodeVariants
+    :returns: array of preceding activity codes, array of following activity codes
+    """
+    if len(codes) < 2:
+        empty = np.empty(0, dtype=codes.dtype)
+        return empty, empty
+    isPair = np.ones(len(codes) - 1, dtype=bool)
+    lastEvents = offsets[1:-1] - 1
+    isPair[lastEvents[(lastEvents >= 0) & (lastEvents < len(isPair))]] = False
+    return codes[:-1][isPair], codes[1:][isPair]
+
+
+def directlyFollowsMatrix(sources: np.ndarray, targets: np.ndarray, numberOfActivities: int) -> np.ndarray:
+    """
+    Creates the boolean directly-follows matrix, where cell [a][b] is true if activity b directly follows activity a
+    ---
+    :param sources: array of preceding activity codes
+    :param targets: array of following activity codes
+    :param numberOfActivities: number of distinct activities in the log
+    :returns: boolean matrix of shape (numberOfActivities, numberOfActivities)
+    """
+    directlyFollows = np.zeros((numberOfActivities, numberOfActivities), dtype=bool)
+    directlyFollows[sources, targets] = True
+    return directlyFollows
+
+
+def footprintFromDirectlyFollows(directlyFollows: np.ndarray) -> np.ndarray:
+    """
+    Derives the footprint matrix from the directly-follows matrix: 1 for causal (a -> b), -1 for reverse causal
+    (a <- b), 2 for parallel (a || b, also used for selfloops) and 0 for choice (a # b)
+    ---
+    :param directlyFollows: boolean directly-follows matrix
+    :returns: int8 footprint matrix
+    """
+    footprintMatrix = directlyFollows.astype(np.int8) - directlyFollows.T.astype(np.int8)
+    footprintMatrix[directlyFollows & directlyFollows.T] = 2
+    return footprintMatrix
+
+
+class SparseFootprint:
+
+    def __init__(self, sources: np.ndarray, targets: np.ndarray, numberOfActivities: int):
+        """
+        Initialises a SparseFootprint, the footprint of a log stored as its sorted directly-follows pairs plus the
+        causal relations of every activity in compressed sparse row form, instead of a dense matrix; memory and row
+        scans grow with the number of pairs instead of the square of the number of activities. An instance of SparseFootprint contains the following instance variables:
+        ---
+        :param sources: array of preceding activity codes (duplicates are allowed)
+        :param targets: array of following activity codes
+        :param numberOfActivities: number of distinct activities in the log
+        :var numberOfActivities
+        :var pairCodes: sorted int64 array with one code (source * numberOfActivities + target) per distinct pair
+        :var causalSuccessorPointers: int64 array, the causal successors of activity a (a -> b without b -> a, the
+            columns with value 1 of its footprint row) are causalSuccessors[causalSuccessorPointers[a]:causalSuccessorPointers[a + 1]]
+        :var causalSuccessors: int64 array of causal successor codes, sorted per activity
+        :var causalPredecessorPointers: int64 array, like causalSuccessorPointers for the columns with value -1
+        :var causalPredecessors: int64 array of causal predecessor codes, sorted per activity
+        """
+        self.numberOfActivities = numberOfActivities
+        self.pairCodes = np.unique(np.asarray(sources, dtype=np.int64) * numberOfActivities
+                                   + np.asarray(targets, dtype=np.int64))
+        pairSources, pairTargets = np.divmod(self.pairCodes, max(1, numberOfActivities))
+        reverseCodes = pairTargets * numberOfActivities + pairSources
+        positions = np.minimum(np.searchsorted(self.pairCodes, reverseCodes), max(0, len(self.pairCodes) - 1))
+        isCausal = self.pairCodes[positions] != reverseCodes if len(self.pairCodes) else np.zeros(0, dtype=bool)
+        self.causalSuccessorPointers = self.__pointers(pairSources[isCausal])
+        self.causalSuccessors = pairTargets[isCausal]
+        byTarget = np.lexsort((pairSources[isCausal], pairTargets[isCausal]))
+        self.causalPredecessorPointers = self.__pointers(pairTargets[isCausal][byTarget])
+        self.causalPredecessors = pairSources[isCausal][byTarget]
+
+    def directlyFollowsPairs(self) -> tuple[np.ndarray, np.ndarray]:
+        return np.divmod(self.pairCodes, max(1, self.numberOfActivities))
+
+    def selfloops(self) -> np.ndarray:
+        """
+        Returns the activities that directly follow themselves (the diagonal of the footprint matrix)
+        """
+        pairSources, pairTargets = self.directlyFollowsPairs()
+        return pairSources[pairSources == pairTargets]
+
+    def rowCandidates(self, rowNr: int, matrixValue: int) -> np.ndarray:
+        """
+        Returns the columns of a footprint row with the given value, which are stored per activity
+        ---
+        :param rowNr: row number (activity) in the footprint
+        :param matrixValue: 1 for the causal successors, -1 for the causal predecessors
+        :returns: ascending array of activity codes
+        """
+        if matrixValue == 1:
+            return self.causalSuccessors[self.causalSuccessorPointers[rowNr]:self.causalSuccessorPointers[rowNr + 1]]
+        return self.causalPredecessors[self.causalPredecessorPointers[rowNr]:self.causalPredecessorPointers[rowNr + 1]]
+
+    def choiceMatrix(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Creates the boolean matrix of the "choice" relations between the given activities: two activities are in a
+        "choice" relation if neither directly follows the other
+        ---
+        :param candidates: ascending array of activity codes
+        :returns: boolean matrix of shape (len(candidates), len(candidates))
+        """
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if not len(self.pairCodes):
+            return np.ones((len(candidates), len(candidates)), dtype=bool)
+        # looks up the pair codes of all candidate pairs in the sorted pair codes, in both directions
+        pairCodes = candidates[:, None] * self.numberOfActivities + candidates[None, :]
+        positions = np.minimum(np.searchsorted(self.pairCodes, pairCodes), len(self.pairCodes) - 1)
+        related = self.pairCodes[positions] == pairCodes
+        related |= related.T
+        return ~related
+
+    def withPairs(self, sources: np.ndarray, targets: np.ndarray) -> "SparseFootprint":
+        """
+        Returns the footprint with additional directly-follows pairs
+        """
+        pairSources, pairTargets = self.directlyFollowsPairs()
+        return SparseFootprint(np.concatenate([pairSources, np.asarray(sources, dtype=np.int64)]),
+                               np.concatenate([pairTargets, np.asarray(targets, dtype=np.int64)]),
+                               self.numberOfActivities)
+
+    def remapped(self, newIndices: list[int], numberOfActivities: int) -> "SparseFootprint":
+        """
+        Returns the footprint with every activity i moved to newIndices[i] in an alphabet of numberOfActivities
+        """
+        pairSources, pairTargets = self.directlyFollowsPairs()
+        newIndices = np.asarray(newIndices, dtype=np.int64)
+        return SparseFootprint(newIndices[pairSources], newIndices[pairTargets], numberOfActivities)
+
+    def changedRows(self, previous: "SparseFootprint") -> list[int]:
+        """
+        Finds the rows whose relations have to be calculated again after directly-follows pairs were added: the rows
+        of both activities of a new pair, and rows in which both activities of a new pair are causal successors or
+        both are causal predecessors, since their "choice" relation ended
+        ---
+        :param previous: footprint before the pairs were added, with the same activity codes
+        :returns: list of row numbers
+        """
+        newPairCodes = np.setdiff1d(self.pairCodes, previous.pairCodes, assume_unique=True)
+        activityANrs, activityBNrs = np.divmod(newPairCodes, max(1, self.numberOfActivities))
+        changedRows = set(activityANrs.tolist()).union(activityBNrs.tolist())
+        for activityANr, activityBNr in zip(activityANrs.tolist(), activityBNrs.tolist()):
+            if activityANr == activityBNr:
+                continue
+            for matrixValue in (1, -1):
+                # rows in which an activity has the footprint value are the activities it has the opposite value for
+                rowsA = self.rowCandidates(activityANr, -matrixValue)
+                rowsB = self.rowCandidates(activityBNr, -matrixValue)
+                changedRows.update(np.intersect1d(rowsA, rowsB, assume_unique=True).tolist())
+        return sorted(changedRows)
+
+    def toDense(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Builds the dense directly-follows and footprint matrices
+        ---
+        :returns: boolean directly-follows matrix, int8 footprint matrix
+        """
+        directlyFollows = directlyFollowsMatrix(*self.directlyFollowsPairs(), self.numberOfActivities)
+        return directlyFollows, footprintFromDirectlyFollows(directlyFollows)
+
+    def __pointers(self, sortedRows: np.ndarray) -> np.ndarray:
+        return np.searchsorted(sortedRows, np.arange(self.numberOfActivities + 1)).astype(np.int64)
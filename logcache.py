@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from directorycache import DirectoryCache
+from logsummary import LogSummary
+from xesstream import iterateTraces
+
+
+class ColumnarLog:
+
+    def __init__(self, activities: list[str], activityCodes: np.ndarray, caseOffsets: np.ndarray,
+                 timestamps: np.ndarray, caseIds: np.ndarray, directory: str | None = None):
+        """
+        Compact column representation of an event log: the events of case i are the entries
+        caseOffsets[i] to caseOffsets[i + 1] of activityCodes and timestamps
+        ---
+        :param activities: list of activities, the position of an activity is its code
+        :param activityCodes: int32 array with the activity code of every event
+        :param caseOffsets: int64 array with the offset of every case, one entry more than there are cases
+        :param timestamps: float64 array with the timestamp of every event in seconds since the epoch (NaN if missing)
+        :param caseIds: unicode array with the id of every case
+        :param directory: directory the arrays are memory-mapped from, None if they are held in memory
+        """
+        self.activities: list[str] = activities
+        self.activityCodes: np.ndarray = activityCodes
+        self.caseOffsets: np.ndarray = caseOffsets
+        self.timestamps: np.ndarray = timestamps
+        self.caseIds: np.ndarray = caseIds
+        self.directory: str | None = directory
+
+    @classmethod
+    def fromXes(cls, filePath: str) -> "ColumnarLog":
+        activityCodes: dict[str, int] = {}
+        codes, offsets, timestamps, caseIds = [], [0], [], []
+        for caseId, activities, traceTimestamps in iterateTraces(filePath):
+            codes.extend(activityCodes.setdefault(activity, len(activityCodes)) for activity in activities)
+            timestamps.extend(np.nan if timestamp is None else timestamp for timestamp in traceTimestamps)
+            offsets.append(len(codes))
+            caseIds.append("" if caseId is None else caseId)
+        return cls(list(activityCodes), np.array(codes, dtype=np.int32), np.array(offsets, dtype=np.int64),
+                   np.array(timestamps, dtype=np.float64), np.array(caseIds, dtype=np.str_))
+
+    @classmethod
+    def fromDataFrame(cls, frame: pd.DataFrame, caseKey: str = "case:concept:name",
+                      activityKey: str = "concept:name", timestampKey: str | None = "time:timestamp") -> "ColumnarLog":
+        """
+        Builds the columns from an event table with one row per event, e.g. a CSV or Parquet extract. The case and
+        activity columns are turned into categorical codes and the events are ordered by case and timestamp with one
+        stable sort (rows with equal timestamps keep their order), so no pm4py objects are created
+        ---
+        :param frame: pandas DataFrame with a case, an activity and optionally a timestamp column
+        :param caseKey: column holding the case id
+        :param activityKey: column holding the activity
+        :param timestampKey: column holding the timestamp, None (or a missing column) to keep the row order
+        :returns: ColumnarLog, with the cases in the order of their first event in the table
+        """
+        frame = frame.dropna(subset=[caseKey, activityKey])
+        caseCodes, caseIds = pd.factorize(frame[caseKey])
+        activities = frame[activityKey].astype(str).astype("category")
+        activityCodes = activities.cat.codes.to_numpy(dtype=np.int32)
+        if timestampKey is not None and timestampKey in frame.columns:
+            timestamps = pd.to_datetime(frame[timestampKey], utc=True, errors="coerce")
+            timestamps = (timestamps - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy(dtype=np.float64)
+            # lexsort is stable and sorts by its last key first; missing timestamps go to the end of their case
+            order = np.lexsort((timestamps, caseCodes))
+        else:
+            timestamps = np.full(len(frame), np.nan)
+            order = np.argsort(caseCodes, kind="stable")
+        caseOffsets = np.searchsorted(caseCodes[order], np.arange(len(caseIds) + 1)).astype(np.int64)
+        return cls(activities.cat.categories.tolist(), activityCodes[order], caseOffsets, timestamps[order],
+                   np.asarray(caseIds).astype(np.str_))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "ColumnarLog":
+        mmapMode = "r" if mmap else None
+        with open(os.path.join(directory, "activities.json"), encoding="utf-8") as file:
+            activities = json.load(file)
+        return cls(activities,
+                   np.load(os.path.join(directory, "activity_codes.npy"), mmap_mode=mmapMode),
+                   np.load(os.path.join(directory, "case_offsets.npy"), mmap_mode=mmapMode),
+                   np.load(os.path.join(directory, "timestamps.npy"), mmap_mode=mmapMode),
+                   np.load(os.path.join(directory, "case_ids.npy"), mmap_mode=mmapMode),
+                   directory if mmap else None)
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "activities.json"), "w", encoding="utf-8") as file:
+            json.dump(self.activities, file)
+        np.save(os.path.join(directory, "activity_codes.npy"), self.activityCodes)
+        np.save(os.path.join(directory, "case_offsets.npy"), self.caseOffsets)
+        np.save(os.path.join(directory, "timestamps.npy"), self.timestamps)
+        np.save(os.path.join(directory, "case_ids.npy"), self.caseIds)
+
+    def numberOfCases(self) -> int:
+        return len(self.caseOffsets) - 1
+
+    def toLogSummary(self) -> LogSummary:
+        summary = LogSummary()
+        for activity in self.activities:
+            summary.encode(activity)
+        codes = self.activityCodes.tolist()
+        offsets = self.caseOffsets.tolist()
+        variants = Counter(tuple(codes[start:end]) for start, end in zip(offsets[:-1], offsets[1:]))
+        for variant, count in variants.items():
+            summary.addVariant(variant, count)
+        return summary
+
+
+class LogCache:
+
+    def __init__(self, cacheDir: str = ".logcache", maxSizeBytes: int = 2 * 1024 ** 3):
+        """
+        Persistent cache of parsed logs as memory-mappable ColumnarLog directories; an entry is keyed by the path,
+        size, modification time and content hash of the log file, and the least recently used entries are evicted
+        once the cache grows beyond maxSizeBytes
+        ---
+        :param cacheDir: directory to store the cache entries in
+        :param maxSizeBytes: maximum total size of all cache entries
+        :var entries: DirectoryCache holding the entries
+        """
+        self.entries = DirectoryCache(cacheDir, maxSizeBytes, "source.json")
+
+    def load(self, filePath: str) -> ColumnarLog:
+        key = self.fingerprint(filePath)
+        if self.entries.contains(key):
+            self.entries.touch(key)
+            return ColumnarLog.load(self.entries.entryDir(key))
+        self.invalidate(filePath)
+        columnarLog = ColumnarLog.fromXes(filePath)
+
+        def writeEntry(entryDir: str) -> None:
+            columnarLog.save(entryDir)
+            with open(os.path.join(entryDir, "source.json"), "w", encoding="utf-8") as file:
+                json.dump({"file_path": os.path.abspath(filePath), "created": time.time()}, file)
+
+        self.entries.write(key, writeEntry)
+        return ColumnarLog.load(self.entries.entryDir(key))
+
+    def fingerprint(self, filePath: str) -> str:
+        stat = os.stat(filePath)
+        contentHash = hashlib.sha256()
+        with open(filePath, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                contentHash.update(chunk)
+        key = f"{os.path.abspath(filePath)}|{stat.st_size}|{stat.st_mtime_ns}|{contentHash.hexdigest()}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    def invalidate(self, filePath: str | None = None) -> None:
+        """
+        Removes all cache entries of a log file, or the whole cache if no file is given
+        """
+        if filePath is None:
+            self.entries.invalidate()
+            return
+        sourcePath = os.path.abspath(filePath)
+        self.entries.invalidate(lambda entryDir: self.__sourcePath(entryDir) == sourcePath)
+
+    def evict(self, keep: str | None = None) -> None:
+        """
+        Removes the least recently used entries until the cache is not larger than maxSizeBytes
+        """
+        self.entries.evict(keep)
+
+    def __sourcePath(self, entryDir: str) -> str | None:
+        try:
+            with open(os.path.join(entryDir, "source.json"), encoding="utf-8") as file:
+                return json.load(file)["file_path"]
+        except (OSError, ValueError, KeyError):
+            return None
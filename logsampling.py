@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+from logcache import ColumnarLog
+from logsummary import LogSummary
+
+RESERVOIR = "reservoir"
+STRATIFIED = "stratified"
+
+
+class LogSample:
+
+    def __init__(self, summary: LogSummary, sampledCases: int, totalCases: int, sampledVariants: int,
+                 totalVariants: int, confidence: float, saturated: bool):
+        """
+        Initialises a LogSample, the result of LogSampler.sample; an instance of LogSample contains the following
+        instance variables:
+        ---
+        :var summary: LogSummary of the sampled cases, to mine and replay instead of the whole log
+        :var sampledCases: number of sampled cases
+        :var totalCases: number of cases in the log
+        :var sampledVariants: number of variants in the sample
+        :var totalVariants: number of variants in the log
+        :var confidence: Good-Turing (leave-one-out) estimate of the probability that the next unit adds no new
+            directly-follows relation: 1 - (units with a relation no other unit has) / (sampled units). Relations
+            that are rare in the log can still be missing from a sample with a high confidence
+        :var saturated: true if the sampling stopped because no new relation turned up for patience units,
+            false if it stopped at maxCases or ran out of cases
+        """
+        self.summary = summary
+        self.sampledCases = sampledCases
+        self.totalCases = totalCases
+        self.sampledVariants = sampledVariants
+        self.totalVariants = totalVariants
+        self.confidence = confidence
+        self.saturated = saturated
+
+    def asDict(self) -> dict:
+        return {"sampledCases": self.sampledCases, "totalCases": self.totalCases,
+                "sampledVariants": self.sampledVariants, "totalVariants": self.totalVariants,
+                "confidence": self.confidence, "saturated": self.saturated}
+
+
+class LogSampler:
+
+    def __init__(self, method: str = RESERVOIR, patience: int = 200, maxCases: int | None = None, seed: int = 0):
+        """
+        Initialises a LogSampler, which draws units of a log until the directly-follows relations (including the
+        start and end activities) stop growing; an instance of LogSampler contains the following instance variables:
+        ---
+        :param method: "reservoir": the units are single cases, drawn uniformly without replacement (every prefix
+            of the drawing order is a reservoir sample of its size); "stratified": the units are whole variants
+            with all their cases, drawn without replacement with a probability proportional to their frequency
+        :param patience: number of consecutive units without a new relation after which the sampling stops
+        :param maxCases: optional number of sampled cases after which the sampling stops in any case
+        :param seed: random seed, the same seed draws the same sample of the same log
+        :var method
+        :var patience
+        :var maxCases
+        :var seed
+        """
+        if method not in (RESERVOIR, STRATIFIED):
+            raise ValueError(f"unknown sampling method {method!r}")
+        self.method = method
+        self.patience = patience
+        self.maxCases = maxCases
+        self.seed = seed
+
+    def sample(self, log) -> LogSample:
+        """
+        Samples a log
+        ---
+        :param log: event log (or any iterable of traces), LogSummary, ColumnarLog or DataFrame
+        :returns: LogSample
+        """
+        summary = self.__summarise(log)
+        variants = list(summary.variantCounts)
+        counts = np.fromiter(summary.variantCounts.values(), dtype=np.int64, count=len(variants))
+        randomGenerator = np.random.default_rng(self.seed)
+        if self.method == RESERVOIR:
+            # the case at position i of a random permutation belongs to the variant whose cumulative count exceeds i
+            units = np.searchsorted(np.cumsum(counts), randomGenerator.permutation(int(counts.sum())), side="right")
+            unitCases = np.ones(len(units), dtype=np.int64)
+        else:
+            # Efraimidis-Spirakis keys u ** (1 / weight) give a weighted drawing order without replacement
+            keys = np.log(randomGenerator.random(len(variants))) / np.maximum(counts, 1)
+            units = np.argsort(-keys, kind="stable")
+            unitCases = counts[units]
+        sampleCounts = dict()
+        # number of sampled units every relation occurred in
+        relationIncidence: dict[tuple, int] = dict()
+        unitsWithoutNewRelation = 0
+        sampledUnits = 0
+        sampledCases = 0
+        saturated = False
+        for variantNr, cases in zip(units.tolist(), unitCases.tolist()):
+            if self.maxCases is not None and sampledCases >= self.maxCases:
+                break
+            if self.maxCases is not None:
+                cases = min(cases, self.maxCases - sampledCases)
+            variant = variants[variantNr]
+            isNew = False
+            for relation in set(self.__relations(variant)):
+                incidence = relationIncidence.get(relation, 0)
+                isNew = isNew or incidence == 0
+                relationIncidence[relation] = incidence + 1
+            sampleCounts[variant] = sampleCounts.get(variant, 0) + cases
+            sampledUnits += 1
+            sampledCases += cases
+            unitsWithoutNewRelation = 0 if isNew else unitsWithoutNewRelation + 1
+            if unitsWithoutNewRelation >= self.patience:
+                saturated = True
+                break
+        novelUnits = sum(1 for variantNr in units[:sampledUnits].tolist()
+                         if any(relationIncidence[relation] == 1 for relation in self.__relations(variants[variantNr])))
+        confidence = 1.0 - novelUnits / sampledUnits if sampledUnits else 0.0
+        # activities are encoded again, so activities that were never sampled are not part of the sample
+        sampleSummary = LogSummary()
+        for variant, count in sampleCounts.items():
+            sampleSummary.addVariant(tuple(sampleSummary.encode(summary.activities[code]) for code in variant), count)
+        return LogSample(sampleSummary, sampledCases, summary.numberOfCases, len(sampleCounts),
+                         len(summary.variantCounts), confidence, saturated)
+
+    @staticmethod
+    def __summarise(log) -> LogSummary:
+        if isinstance(log, LogSummary):
+            return log
+        if isinstance(log, pd.DataFrame):
+            log = ColumnarLog.fromDataFrame(log)
+        if isinstance(log, ColumnarLog):
+            return log.toLogSummary()
+        return LogSummary.fromEventLog(log)
+
+    @staticmethod
+    def __relations(variant: tuple[int]):
+        """
+        Yields the directly-follows pairs of a variant plus its start and end activity, marked by None
+        """
+        if not variant:
+            return
+        yield None, variant[0]
+        yield variant[-1], None
+        yield from zip(variant, variant[1:])
@@ -0,0 +1,185 @@
+import hashlib
+import json
+from collections import Counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pm4py.objects.log.obj import EventLog
+
+
+def acceptsLogSummary(function):
+    """
+    Marks an algorithm function that can be called with a LogSummary instead of an event log
+    ---
+    :param function: algorithm function
+    :returns: the same function
+    """
+    function.acceptsLogSummary = True
+    return function
+
+
+class LogSummary:
+
+    def __init__(self):
+        """
+        Initialises an empty LogSummary; a LogSummary keeps the information the miners and the analysis need from
+        an event log, with every activity interned as an integer code:
+        ---
+        :var activities: list of activities, the position of an activity is its code
+        :var activityCodes: python dictionary with format (key: activity, value: code)
+        :var variantCounts: python dictionary with format (key: tuple of activity codes, value: number of traces)
+        :var directlyFollowsCounts: python dictionary with format (key: (code, following code), value: number of occurrences)
+        :var startActivityCounts: python dictionary with format (key: code, value: number of traces starting with it)
+        :var endActivityCounts: python dictionary with format (key: code, value: number of traces ending with it)
+        :var numberOfCases: number of traces
+        :var numberOfEvents: number of events
+        """
+        self.activities: list[str] = []
+        self.activityCodes: dict[str, int] = dict()
+        self.variantCounts: dict[tuple[int], int] = dict()
+        self.directlyFollowsCounts: dict[tuple[int, int], int] = dict()
+        self.startActivityCounts: dict[int, int] = dict()
+        self.endActivityCounts: dict[int, int] = dict()
+        self.numberOfCases = 0
+        self.numberOfEvents = 0
+
+    @classmethod
+    def fromEventLog(cls, log, activityKey: str = "concept:name") -> "LogSummary":
+        """
+        Summarises an event log in a single pass over its events: every trace is encoded into a variant of activity
+        codes, and the directly-follows and start/end activity counts are then derived once per distinct variant
+        ---
+        :param log: event log, as defined by the pm4py library, or any iterable of traces
+        :param activityKey: event attribute holding the activity
+        :returns: LogSummary
+        """
+        summary = cls()
+        variantCounts = Counter(tuple(summary.encode(event[activityKey]) for event in trace) for trace in log)
+        for variant, count in variantCounts.items():
+            summary.addVariant(variant, count)
+        return summary
+
+    @classmethod
+    def fromCounts(cls, directlyFollowsCounts: dict[tuple[str, str], int], startActivityCounts: dict[str, int],
+                   endActivityCounts: dict[str, int]) -> "LogSummary":
+        """
+        Creates a LogSummary from directly-follows and start/end activity counts alone, e.g. those of a window of an
+        event stream; it has no variants, so it can be mined but not replayed
+        ---
+        :param directlyFollowsCounts: python dictionary with format (key: (activity, following activity), value: count)
+        :param startActivityCounts: python dictionary with format (key: activity, value: count)
+        :param endActivityCounts: python dictionary with format (key: activity, value: count)
+        :returns: LogSummary
+        """
+        summary = cls()
+        summary.directlyFollowsCounts = {(summary.encode(a), summary.encode(b)): count
+                                         for (a, b), count in directlyFollowsCounts.items()}
+        summary.startActivityCounts = {summary.encode(activity): count for activity, count in startActivityCounts.items()}
+        summary.endActivityCounts = {summary.encode(activity): count for activity, count in endActivityCounts.items()}
+        return summary
+
+    @classmethod
+    def merged(cls, *summaries: "LogSummary") -> "LogSummary":
+        """
+        Combines the summaries of disjoint sets of traces, e.g. the batches of a growing log, into a new LogSummary;
+        the given summaries are not changed
+        ---
+        :param summaries: LogSummaries to combine
+        :returns: LogSummary
+        """
+        merged = cls()
+        for summary in summaries:
+            codes = [merged.encode(activity) for activity in summary.activities]
+            for variant, count in summary.variantCounts.items():
+                variant = tuple(codes[code] for code in variant)
+                merged.variantCounts[variant] = merged.variantCounts.get(variant, 0) + count
+            for (code, followingCode), count in summary.directlyFollowsCounts.items():
+                pair = (codes[code], codes[followingCode])
+                merged.directlyFollowsCounts[pair] = merged.directlyFollowsCounts.get(pair, 0) + count
+            for mergedCounts, counts in ((merged.startActivityCounts, summary.startActivityCounts),
+                                         (merged.endActivityCounts, summary.endActivityCounts)):
+                for code, count in counts.items():
+                    mergedCounts[codes[code]] = mergedCounts.get(codes[code], 0) + count
+            merged.numberOfCases += summary.numberOfCases
+            merged.numberOfEvents += summary.numberOfEvents
+        return merged
+
+    def encode(self, activity: str) -> int:
+        """
+        Returns the code of an activity, interning the activity if it has not been seen before
+        ---
+        :param activity: activity name
+        :returns: activity code
+        """
+        code = self.activityCodes.get(activity)
+        if code is None:
+            code = len(self.activities)
+            self.activityCodes[activity] = code
+            self.activities.append(activity)
+        return code
+
+    def addTrace(self, activities) -> None:
+        """
+        Counts a trace into the variant, directly-follows and start/end activity counts
+        ---
+        :param activities: sequence of activity names of the trace
+        :returns: NONE
+        """
+        self.addVariant(tuple(map(self.encode, activities)))
+
+    def addVariant(self, variant: tuple[int], count: int = 1) -> None:
+        """
+        Counts traces of an already encoded variant into the variant, directly-follows and start/end activity counts
+        ---
+        :param variant: tuple of activity codes
+        :param count: number of traces with this variant
+        :returns: NONE
+        """
+        self.numberOfCases += count
+        self.numberOfEvents += len(variant) * count
+        self.variantCounts[variant] = self.variantCounts.get(variant, 0) + count
+        if not variant:
+            return
+        self.startActivityCounts[variant[0]] = self.startActivityCounts.get(variant[0], 0) + count
+        self.endActivityCounts[variant[-1]] = self.endActivityCounts.get(variant[-1], 0) + count
+        for pair in zip(variant, variant[1:]):
+            self.directlyFollowsCounts[pair] = self.directlyFollowsCounts.get(pair, 0) + count
+
+    def getFingerprint(self) -> str:
+        """
+        Returns a hash of the variants and their frequencies; it does not depend on the order in which the traces
+        and activities were seen, so the same log gives the same fingerprint however it was read
+        ---
+        :returns: hexadecimal sha256 digest
+        """
+        variants = sorted([list(variant), count] for variant, count in self.getVariantsAsTuples().items())
+        return hashlib.sha256(json.dumps(variants, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def getVariantsAsTuples(self) -> dict[tuple[str], int]:
+        return {tuple(self.activities[code] for code in variant): count for variant, count in self.variantCounts.items()}
+
+    def getStartActivities(self) -> dict[str, int]:
+        return {self.activities[code]: count for code, count in self.startActivityCounts.items()}
+
+    def getEndActivities(self) -> dict[str, int]:
+        return {self.activities[code]: count for code, count in self.endActivityCounts.items()}
+
+    def getDirectlyFollows(self) -> dict[tuple[str, str], int]:
+        return {(self.activities[a], self.activities[b]): count for (a, b), count in self.directlyFollowsCounts.items()}
+
+    def toEventLog(self, activityKey: str = "concept:name") -> "EventLog":
+        """
+        Creates an event log with the same variants and frequencies; all traces of a variant share one Trace object,
+        so the memory needed grows with the number of variants instead of the number of events
+        ---
+        :param activityKey: event attribute to store the activity in
+        :returns: event log, as defined by the pm4py library
+        """
+        from pm4py.objects.log.obj import EventLog, Trace, Event
+        log = EventLog()
+        for variantNr, (variant, count) in enumerate(self.variantCounts.items()):
+            trace = Trace([Event({activityKey: self.activities[code]}) for code in variant],
+                          attributes={"concept:name": f"variant {variantNr}"})
+            for _ in range(count):
+                log.append(trace)
+        return log
@@ -0,0 +1,166 @@
+import numpy as np
+
+from compactnet import CompactNet
+from footprint import directlyFollowsMatrix, footprintFromDirectlyFollows
+from logsummary import LogSummary
+
+# footprint value of cells whose activity is missing from one of the compared footprints
+ABSENT = np.int8(-128)
+
+
+class FootprintDiff:
+
+    def __init__(self, activities: list[str], changedCells: list[tuple[str, str, int, int]], addedActivities: list[str],
+                 removedActivities: list[str], agreement: float):
+        """
+        Initialises a FootprintDiff, the differences between two footprint matrices; an instance of FootprintDiff
+        contains the following instance variables:
+        ---
+        :var activities: list of the activities of both footprints, those of the first one first
+        :var changedCells: list of (activity, activity, value before, value after) for every cell of two activities
+            both footprints have whose relation differs (1: causal, -1: reverse causal, 2: parallel, 0: choice)
+        :var addedActivities: list of activities only the second footprint has
+        :var removedActivities: list of activities only the first footprint has
+        :var agreement: share of the cells of the common activities with the same relation in both footprints
+        """
+        self.activities = activities
+        self.changedCells = changedCells
+        self.addedActivities = addedActivities
+        self.removedActivities = removedActivities
+        self.agreement = agreement
+
+    def isEmpty(self) -> bool:
+        return not (self.changedCells or self.addedActivities or self.removedActivities)
+
+
+class NetDiff:
+
+    def __init__(self, addedPlaces: list[tuple], removedPlaces: list[tuple], addedArcs: list[tuple],
+                 removedArcs: list[tuple], addedTransitions: list[str], removedTransitions: list[str]):
+        """
+        Initialises a NetDiff, the structural differences between two petri nets; places are compared by their
+        signature (input transitions, output transitions), so place names and ids do not matter. An instance of
+        NetDiff contains the following instance variables:
+        ---
+        :var addedPlaces: list of place signatures only the second net has (once per additional place)
+        :var removedPlaces: list of place signatures only the first net has (once per missing place)
+        :var addedArcs: list of arcs only the second net has, as (place signature, transition, "in" or "out"),
+            "in" for an arc from the transition into the place
+        :var removedArcs: list of arcs only the first net has, in the same format
+        :var addedTransitions: list of transitions only the second net has
+        :var removedTransitions: list of transitions only the first net has
+        """
+        self.addedPlaces = addedPlaces
+        self.removedPlaces = removedPlaces
+        self.addedArcs = addedArcs
+        self.removedArcs = removedArcs
+        self.addedTransitions = addedTransitions
+        self.removedTransitions = removedTransitions
+
+    def isEmpty(self) -> bool:
+        return not (self.addedPlaces or self.removedPlaces or self.addedTransitions or self.removedTransitions)
+
+    def asDict(self) -> dict:
+        return {"addedPlaces": len(self.addedPlaces), "removedPlaces": len(self.removedPlaces),
+                "addedArcs": len(self.addedArcs), "removedArcs": len(self.removedArcs),
+                "addedTransitions": len(self.addedTransitions), "removedTransitions": len(self.removedTransitions)}
+
+
+def footprintOf(log: LogSummary) -> tuple[np.ndarray, list[str]]:
+    """
+    Builds the footprint matrix of a LogSummary from its directly-follows counts
+    ---
+    :param log: LogSummary
+    :returns: int8 footprint matrix, list of activities (the position of an activity is its row)
+    """
+    pairs = np.array(list(log.directlyFollowsCounts), dtype=np.int64).reshape(-1, 2)
+    return (footprintFromDirectlyFollows(directlyFollowsMatrix(pairs[:, 0], pairs[:, 1], len(log.activities))),
+            list(log.activities))
+
+
+def diffFootprints(footprintA: np.ndarray, activitiesA: list[str], footprintB: np.ndarray,
+                   activitiesB: list[str]) -> FootprintDiff:
+    """
+    Compares two footprint matrices cell by cell after aligning their activities by name
+    ---
+    :param footprintA: footprint matrix, e.g. G2_AlphaAlgorithm.getFootprintMatrix()
+    :param activitiesA: activities of the rows of footprintA, e.g. from G2_AlphaAlgorithm.getIndexIsKey()
+    :param footprintB: footprint matrix to compare to
+    :param activitiesB: activities of the rows of footprintB
+    :returns: FootprintDiff
+    """
+    positionsA = {activity: position for position, activity in enumerate(activitiesA)}
+    activities = list(activitiesA) + [activity for activity in activitiesB if activity not in positionsA]
+    positions = {activity: position for position, activity in enumerate(activities)}
+    alignedA = np.full((len(activities), len(activities)), ABSENT, dtype=np.int8)
+    alignedB = np.full((len(activities), len(activities)), ABSENT, dtype=np.int8)
+    alignedA[:len(activitiesA), :len(activitiesA)] = footprintA
+    indicesB = np.array([positions[activity] for activity in activitiesB], dtype=np.int64)
+    alignedB[np.ix_(indicesB, indicesB)] = footprintB
+    isCommon = (alignedA != ABSENT) & (alignedB != ABSENT)
+    rows, columns = np.nonzero(isCommon & (alignedA != alignedB))
+    changedCells = [(activities[row], activities[column], int(alignedA[row, column]), int(alignedB[row, column]))
+                    for row, column in zip(rows.tolist(), columns.tolist())]
+    commonCells = int(np.count_nonzero(isCommon))
+    activitiesOfB = set(activitiesB)
+    return FootprintDiff(activities, changedCells, [activity for activity in activitiesB if activity not in positionsA],
+                         [activity for activity in activitiesA if activity not in activitiesOfB],
+                         1.0 - len(changedCells) / commonCells if commonCells else 1.0)
+
+
+def placeSignatures(net: CompactNet) -> list[tuple[tuple[str], tuple[str]]]:
+    """
+    Describes every place by the sorted transitions that produce tokens in it and the sorted transitions that
+    consume tokens from it; transitions are named by their label, invisible ones by their name
+    ---
+    :param net: CompactNet
+    :returns: list of (input transitions, output transitions), one per place in the order of the place ids
+    """
+    transitions = [transitionName if label is None else label
+                   for transitionName, label in zip(net.transitionNames, net.transitionLabels)]
+    inputs, outputs = [[] for _ in net.placeNames], [[] for _ in net.placeNames]
+    for placeId, transitionId, _ in net.postArcs.tolist():
+        inputs[placeId].append(transitions[transitionId])
+    for placeId, transitionId, _ in net.preArcs.tolist():
+        outputs[placeId].append(transitions[transitionId])
+    return [(tuple(sorted(placeInputs)), tuple(sorted(placeOutputs)))
+            for placeInputs, placeOutputs in zip(inputs, outputs)]
+
+
+def diffNets(netA: CompactNet, netB: CompactNet) -> NetDiff:
+    """
+    Compares two nets by their place signatures, so nets that differ only in place names give an empty NetDiff;
+    pm4py petri nets can be converted with CompactNet.fromPetriNet first
+    ---
+    :param netA: CompactNet
+    :param netB: CompactNet to compare to
+    :returns: NetDiff
+    """
+    signaturesA, signaturesB = placeSignatures(netA), placeSignatures(netB)
+    removedPlaces = _multisetDifference(signaturesA, signaturesB)
+    addedPlaces = _multisetDifference(signaturesB, signaturesA)
+    transitionsA = {transitionName if label is None else label
+                    for transitionName, label in zip(netA.transitionNames, netA.transitionLabels)}
+    transitionsB = {transitionName if label is None else label
+                    for transitionName, label in zip(netB.transitionNames, netB.transitionLabels)}
+    return NetDiff(addedPlaces, removedPlaces, _arcs(addedPlaces), _arcs(removedPlaces),
+                   sorted(transitionsB - transitionsA), sorted(transitionsA - transitionsB))
+
+
+def _multisetDifference(signatures: list[tuple], otherSignatures: list[tuple]) -> list[tuple]:
+    remaining = dict()
+    for signature in otherSignatures:
+        remaining[signature] = remaining.get(signature, 0) + 1
+    difference = []
+    for signature in signatures:
+        if remaining.get(signature, 0):
+            remaining[signature] -= 1
+        else:
+            difference.append(signature)
+    return difference
+
+
+def _arcs(signatures: list[tuple]) -> list[tuple]:
+    return [arc for signature in signatures
+            for arc in [(signature, transition, "in") for transition in signature[0]]
+            + [(signature, transition, "out") for transition in signature[1]]]
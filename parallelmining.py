@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from footprint import SparseFootprint
+from placeenumeration import anchoredRelations
+
+if TYPE_CHECKING:
+    from pm4py.objects.log.obj import EventLog
+
+# state of a worker process, set once by the pool initializer instead of being pickled with every task
+_workerLog: "EventLog" = None
+_workerFootprintMatrix: np.ndarray | SparseFootprint = None
+_workerMaxSetSize: int = None
+
+
+def shardBounds(numberOfCases: int, numberOfShards: int) -> list[tuple[int, int]]:
+    """
+    Splits the cases of a log into contiguous shards of (almost) equal size
+    ---
+    :param numberOfCases: number of traces in the log
+    :param numberOfShards: number of shards to create
+    :returns: list of (first case index, last case index + 1)
+    """
+    borders = np.linspace(0, numberOfCases, max(1, min(numberOfShards, numberOfCases)) + 1).astype(int)
+    return [(int(first), int(last)) for first, last in zip(borders[:-1], borders[1:])]
+
+
+def summariseLog(log: "EventLog", workers: int, activityKey: str = "concept:name"):
+    """
+    Computes the activities, start and end activities and the directly-follows relation of a log in worker processes:
+    every worker summarises a shard of cases and the partial summaries are merged by union
+    ---
+    :param log: event log
+    :param workers: number of worker processes
+    :param activityKey: event attribute holding the activity
+    :returns: sorted list of activities, list of start activities, list of end activities, set of directly-follows pairs
+    """
+    activities = set()
+    startActivities = dict()
+    endActivities = dict()
+    directlyFollows = set()
+    # with the fork start method, the log is handed to the workers without being pickled
+    with ProcessPoolExecutor(workers, initializer=_shareLog, initargs=(log,)) as executor:
+        shards = shardBounds(len(log), workers * 4)
+        for shardActivities, shardStarts, shardEnds, shardDirectlyFollows in executor.map(
+                _summariseShard, shards, [activityKey] * len(shards)):
+            activities.update(shardActivities)
+            startActivities.update(dict.fromkeys(shardStarts))
+            endActivities.update(dict.fromkeys(shardEnds))
+            directlyFollows.update(shardDirectlyFollows)
+    return sorted(activities), list(startActivities), list(endActivities), directlyFollows
+
+
+def enumerateRowRelations(footprintMatrix: np.ndarray | SparseFootprint, rowNrs, maxSetSize: int,
+                          workers: int) -> dict[tuple[str, int], list[tuple[int]]]:
+    """
+    Enumerates the relations of the given footprint matrix rows in worker processes, one anchor activity per task
+    ---
+    :param footprintMatrix: footprint matrix of the data, dense or as SparseFootprint
+    :param rowNrs: row numbers (anchor activities) to enumerate
+    :param maxSetSize: optional cap for the number of activities in a group
+    :param workers: number of worker processes
+    :returns: python dictionary with format (key: (arc anchor point, row number), value: list of sets)
+    """
+    rowRelations = dict()
+    with ProcessPoolExecutor(workers, initializer=_shareFootprintMatrix, initargs=(footprintMatrix, maxSetSize)) as executor:
+        for rowNr, startRelations, endRelations in executor.map(_anchorRelations, rowNrs):
+            rowRelations[("start", rowNr)] = startRelations
+            rowRelations[("end", rowNr)] = endRelations
+    return rowRelations
+
+
+def _shareLog(log: "EventLog") -> None:
+    global _workerLog
+    _workerLog = log
+
+
+def _summariseShard(bounds: tuple[int, int], activityKey: str):
+    activities = set()
+    startActivities = dict()
+    endActivities = dict()
+    directlyFollows = set()
+    for caseNr in range(*bounds):
+        trace = [event[activityKey] for event in _workerLog[caseNr]]
+        if not trace:
+            continue
+        activities.update(trace)
+        startActivities[trace[0]] = None
+        endActivities[trace[-1]] = None
+        directlyFollows.update(zip(trace, trace[1:]))
+    return activities, list(startActivities), list(endActivities), directlyFollows
+
+
+def _shareFootprintMatrix(footprintMatrix: np.ndarray | SparseFootprint, maxSetSize: int) -> None:
+    global _workerFootprintMatrix, _workerMaxSetSize
+    _workerFootprintMatrix = footprintMatrix
+    _workerMaxSetSize = maxSetSize
+
+
+def _anchorRelations(rowNr: int):
+    return (rowNr,
+            anchoredRelations(_workerFootprintMatrix, rowNr, 1, "start", _workerMaxSetSize),
+            anchoredRelations(_workerFootprintMatrix, rowNr, -1, "end", _workerMaxSetSize))
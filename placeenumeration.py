@@ -0,0 +1,206 @@
+import time
+
+import numpy as np
+
+from footprint import SparseFootprint
+
+
+class EnumerationBudget:
+
+    def __init__(self, timeLimit: float = None, maxCandidates: int = None, startTime: float = None):
+        """
+        Initialises an EnumerationBudget, the limits of a budgeted place enumeration; an instance of EnumerationBudget
+        contains the following instance variables:
+        ---
+        :param timeLimit: optional number of seconds after startTime at which the enumeration stops
+        :param maxCandidates: optional number of candidate relations after which the enumeration stops
+        :param startTime: time.perf_counter() value the time limit counts from, now by default
+        :var deadline: time.perf_counter() value at which the enumeration stops, None without time limit
+        :var remainingCandidates: number of candidate relations that may still be generated, None without limit
+        :var exhausted: true once a limit was reached
+        """
+        startTime = time.perf_counter() if startTime is None else startTime
+        self.deadline = None if timeLimit is None else startTime + timeLimit
+        self.remainingCandidates = maxCandidates
+        self.exhausted = False
+
+    def isExhausted(self) -> bool:
+        if not self.exhausted:
+            self.exhausted = ((self.remainingCandidates is not None and self.remainingCandidates <= 0)
+                              or (self.deadline is not None and time.perf_counter() >= self.deadline))
+        return self.exhausted
+
+    def spend(self) -> None:
+        """
+        Counts one generated candidate relation
+        """
+        if self.remainingCandidates is not None:
+            self.remainingCandidates -= 1
+
+
+def bitmaskOf(activityNrs) -> int:
+    """
+    Encodes a collection of activity numbers as an integer bitmask
+    ---
+    :param activityNrs: iterable of activity numbers
+    :returns: bitmask with bit i set for every activity number i
+    """
+    bitmask = 0
+    for activityNr in activityNrs:
+        bitmask |= 1 << activityNr
+    return bitmask
+
+
+def activityNrsOf(bitmask: int) -> tuple[int]:
+    """
+    Decodes an integer bitmask into the ascending tuple of activity numbers it contains
+    ---
+    :param bitmask: bitmask of activity numbers
+    :returns: sorted tuple of activity numbers
+    """
+    activityNrs = []
+    while bitmask:
+        lowestBit = bitmask & -bitmask
+        activityNrs.append(lowestBit.bit_length() - 1)
+        bitmask ^= lowestBit
+    return tuple(activityNrs)
+
+
+def maximalChoiceGroups(candidates: list[int], choiceMatrix: np.ndarray, maxSetSize: int = None,
+                        budget: EnumerationBudget = None) -> list[tuple[int]]:
+    """
+    Treats the candidate activities of a footprint row as a graph with an edge between every two activities in a
+    "choice" relation and enumerates its maximal cliques (Bron-Kerbosch with pivoting on bitsets). Every group is
+    generated exactly once, so the cost grows with the number of groups instead of the number of merges.
+    If maxSetSize is given, the groups that are maximal among all groups of at most maxSetSize activities are returned.
+    If a budget is given, the enumeration stops once it is exhausted and returns the groups found so far
+    ---
+    :param candidates: ascending list of activity numbers eligible for combination
+    :param choiceMatrix: boolean matrix, cell [i][j] is true if candidates[i] and candidates[j] are in a "choice" relation
+    :param maxSetSize: optional cap for the number of activities in a group
+    :param budget: optional EnumerationBudget, every returned group is counted as one candidate relation
+    :returns: list of groups, each an ascending tuple of activity numbers
+    """
+    if maxSetSize is not None and maxSetSize < 1:
+        raise ValueError("maxSetSize must be at least 1")
+    neighbours = []
+    for i in range(len(candidates)):
+        neighbours.append(bitmaskOf(j for j in np.flatnonzero(choiceMatrix[i]).tolist() if j != i))
+    groups = []
+    # each stack entry holds the bitsets R (current group), P (possible extensions) and X (already explored extensions)
+    stack = [(0, (1 << len(candidates)) - 1, 0)]
+    while stack:
+        if budget is not None and budget.isExhausted():
+            break
+        group, possible, explored = stack.pop()
+        if maxSetSize is not None and group.bit_count() == maxSetSize:
+            groups.append(group)
+            if budget is not None:
+                budget.spend()
+            continue
+        if not possible:
+            if not explored:
+                groups.append(group)
+                if budget is not None:
+                    budget.spend()
+            continue
+        branching = possible
+        if maxSetSize is None:
+            # pivoting: extensions adjacent to the pivot only lead to groups that are found via the pivot itself
+            pivot = max(activityNrsOf(possible | explored), key=lambda u: (possible & neighbours[u]).bit_count())
+            branching = possible & ~neighbours[pivot]
+        for v in activityNrsOf(branching):
+            vBit = 1 << v
+            stack.append((group | vBit, possible & neighbours[v], explored & neighbours[v]))
+            possible &= ~vBit
+            explored |= vBit
+    return [tuple(candidates[i] for i in activityNrsOf(group)) for group in groups]
+
+
+def anchoredRelations(footprintMatrix: np.ndarray | SparseFootprint, rowNr: int, matrixValue: int, relationRole: str,
+                      maxSetSize: int = None, budget: EnumerationBudget = None) -> list[tuple[int]]:
+    """
+    Enumerates the maximal groups of activities in a row of the footprint matrix that are pairwise in a
+    "choice" relation and turns them into relations anchored at the row activity
+    ---
+    :param footprintMatrix: footprint matrix of the data, dense or as SparseFootprint
+    :param rowNr: row number (anchor activity) in the footprint matrix
+    :param matrixValue: footprint value of the columns eligible for combination (1: successors, -1: predecessors)
+    :param relationRole: "start" if the row activity is the anchor at the start of the relation, "end" otherwise
+    :param maxSetSize: optional cap for the number of activities in a group
+    :param budget: optional EnumerationBudget that stops the enumeration early
+    :returns: list of relations
+    """
+    relations = []
+    if isinstance(footprintMatrix, SparseFootprint):
+        candidates = footprintMatrix.rowCandidates(rowNr, matrixValue)
+    else:
+        candidates = np.flatnonzero(footprintMatrix[rowNr] == matrixValue)
+    if not len(candidates):
+        return relations
+    if isinstance(footprintMatrix, SparseFootprint):
+        choiceMatrix = footprintMatrix.choiceMatrix(candidates)
+    else:
+        choiceMatrix = footprintMatrix[np.ix_(candidates, candidates)] == 0
+    # get all maximal groups of activity numbers in the column that are eligible for combination
+    for orderedRelation in maximalChoiceGroups(candidates.tolist(), choiceMatrix, maxSetSize, budget):
+        # depending on the role of the relation, append the row (activity) number to the beginning or to the end of the relation
+        if relationRole == "start":
+            fromActivities = (rowNr,)
+            toActivities = orderedRelation
+        else:
+            fromActivities = orderedRelation
+            toActivities = (rowNr,)
+        relations.append(fromActivities + toActivities)
+    return relations
+
+
+def anchorKey(relation: tuple[int], relationRole: str) -> tuple[int, str]:
+    """
+    Returns the anchor activity of a relation of anchoredRelations together with its role
+    """
+    return (relation[0] if relationRole == "start" else relation[-1]), relationRole
+
+
+def findMaximalRelations(relationDict: dict[tuple[int], str], selfloopMask: int) -> dict[tuple[int], str]:
+    """
+    Keeps only the relations that are not contained in another relation with more than two activities and that do not
+    contain an activity with a selfloop. The relations must be the ones of anchoredRelations: an anchor activity
+    (first of a "start" relation, last of an "end" relation) plus a group of activities that are pairwise in a
+    "choice" relation and causally related to the anchor. A relation can then only be contained in a relation whose
+    anchor is one of its own activities, as its anchor and a group activity cannot both be in the other group, and
+    not in another relation of its own anchor and role, as the groups of a row are maximal. Only these relations are
+    tested, all at once on bitsets packed into 64 bit words
+    ---
+    :param relationDict: python dictionary with format (key: relation, value: arc anchor point)
+    :param selfloopMask: bitmask of all activities that directly follow themselves
+    :returns: python dictionary with the maximal relations of relationDict, in the same format
+    """
+    relations = list(relationDict)
+    if not relations:
+        return dict()
+    relationNrs = np.repeat(np.arange(len(relations)), [len(relation) for relation in relations])
+    activityNrs = np.fromiter((activityNr for relation in relations for activityNr in relation), dtype=np.int64,
+                              count=len(relationNrs))
+    words = np.zeros((len(relations), int(activityNrs.max()) // 64 + 1), dtype=np.uint64)
+    np.bitwise_or.at(words, (relationNrs, activityNrs // 64),
+                     np.left_shift(np.uint64(1), (activityNrs % 64).astype(np.uint64)))
+    # relations with more than two activities, listed per anchor activity and role
+    anchorIndex: dict[tuple[int, str], list[int]] = dict()
+    for relationNr, relation in enumerate(relations):
+        if len(relation) > 2:
+            anchorIndex.setdefault(anchorKey(relation, relationDict[relation]), []).append(relationNr)
+    anchorIndex = {key: np.array(relationNrs) for key, relationNrs in anchorIndex.items()}
+    maximalRelations = dict()
+    for relationNr, relation in enumerate(relations):
+        if bitmaskOf(relation) & selfloopMask:
+            continue
+        ownKey = anchorKey(relation, relationDict[relation])
+        candidates = [anchorIndex[key] for activityNr in relation for key in ((activityNr, "start"), (activityNr, "end"))
+                      if key != ownKey and key in anchorIndex]
+        if candidates:
+            bitset = words[relationNr]
+            if ((words[np.concatenate(candidates)] & bitset) == bitset).all(axis=1).any():
+                continue
+        maximalRelations[relation] = relationDict[relation]
+    return maximalRelations
@@ -0,0 +1,104 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable
+
+
+class PhaseRecord:
+
+    def __init__(self):
+        """
+        Initialises a PhaseRecord, the measurements of one phase of a run; an instance of PhaseRecord contains the
+        following instance variables:
+        ---
+        :var seconds: summed wall time of all calls of the phase
+        :var calls: number of calls of the phase
+        :var sizes: python dictionary with format (key: name of a size, value: size after the last call)
+        :var peakMemoryBytes: highest tracemalloc peak of a call above the memory in use when it started (None if
+            memory is not traced)
+        """
+        self.seconds = 0.0
+        self.calls = 0
+        self.sizes: dict[str, int] = dict()
+        self.peakMemoryBytes: int | None = None
+
+    def asDict(self) -> dict:
+        return {"seconds": self.seconds, "calls": self.calls, "sizes": dict(self.sizes),
+                "peakMemoryBytes": self.peakMemoryBytes}
+
+
+class PhaseProfiler:
+
+    def __init__(self, traceMemory: bool = False, callback: Callable[[str, PhaseRecord], None] | None = None):
+        """
+        Initialises a PhaseProfiler, which measures the phases of an algorithm run; an instance of PhaseProfiler
+        contains the following instance variables:
+        ---
+        :param traceMemory: if true, the peak memory of every phase is measured with tracemalloc (slows the run down)
+        :param callback: optional function that is called with the phase name and its PhaseRecord after every call
+            of a phase
+        :var records: python dictionary with format (key: phase name, value: PhaseRecord), in the order the phases
+            first ran
+        """
+        self.traceMemory = traceMemory
+        self.callback = callback
+        self.records: dict[str, PhaseRecord] = dict()
+        # running memory peaks of the phases that are currently open, innermost last
+        self.__openPeaks: list[int] = []
+        self.__startedTracing = False
+
+    def reset(self):
+        """
+        Forgets the measurements of the previous run
+        """
+        self.records = dict()
+
+    @contextmanager
+    def phase(self, phaseName: str):
+        """
+        Measures the enclosed block as one call of a phase; the block can add sizes to the yielded PhaseRecord.
+        Phases can be nested, the time and memory of an inner phase are included in the outer one
+        ---
+        :param phaseName: name of the phase
+        :returns: PhaseRecord of the phase
+        """
+        record = self.records.setdefault(phaseName, PhaseRecord())
+        baseline = self.__startMemoryTrace() if self.traceMemory else None
+        startTime = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds += time.perf_counter() - startTime
+            record.calls += 1
+            if baseline is not None:
+                peak = self.__stopMemoryTrace() - baseline
+                record.peakMemoryBytes = max(record.peakMemoryBytes or 0, peak)
+        if self.callback is not None:
+            self.callback(phaseName, record)
+
+    def getTimings(self) -> dict[str, float]:
+        return {phaseName: record.seconds for phaseName, record in self.records.items()}
+
+    def asDict(self) -> dict[str, dict]:
+        return {phaseName: record.asDict() for phaseName, record in self.records.items()}
+
+    def __startMemoryTrace(self) -> int:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__startedTracing = True
+        current, peak = tracemalloc.get_traced_memory()
+        # the peak is reset for the new phase, so the peak so far is kept for the phase around it
+        if self.__openPeaks:
+            self.__openPeaks[-1] = max(self.__openPeaks[-1], peak)
+        tracemalloc.reset_peak()
+        self.__openPeaks.append(current)
+        return current
+
+    def __stopMemoryTrace(self) -> int:
+        peak = max(self.__openPeaks.pop(), tracemalloc.get_traced_memory()[1])
+        if self.__openPeaks:
+            self.__openPeaks[-1] = max(self.__openPeaks[-1], peak)
+        elif self.__startedTracing:
+            tracemalloc.stop()
+            self.__startedTracing = False
+        return peak
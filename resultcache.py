@@ -0,0 +1,159 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+import types
+from functools import lru_cache
+from typing import Callable, TYPE_CHECKING
+
+from compactnet import CompactNet
+from directorycache import DirectoryCache
+
+if TYPE_CHECKING:
+    from pm4py.objects.petri_net.obj import PetriNet, Marking
+
+# part of every cache key; increase it when a change of the replay or of the stored results makes older entries wrong
+RESULT_CACHE_VERSION = 2
+
+
+def with_cache_key(function: Callable, key: str) -> Callable:
+    """
+    Marks an algorithm function with the key its results are cached under, e.g. for a lambda or a closure, whose
+    behaviour cannot be told from its name; the key must change whenever the results of the function do
+    ---
+    :param function: algorithm function
+    :param key: cache key of the function, e.g. "G2 with 2 start and end tokens"
+    :returns: the same function
+    """
+    function.cache_key = key
+    return function
+
+
+def algorithm_configuration(function: Callable) -> dict | None:
+    """
+    Describes an algorithm function for a cache key: its qualified name, the version of its code (the version of
+    its package, or a hash of the source files next to its module) and, for a bound method of an object with
+    getConfiguration (e.g. G2_AlphaAlgorithm(1, 1).createPetriNet), the settings of that object. Functions whose
+    results cannot be told from these (lambdas, closures, other callables and bound methods of objects without
+    getConfiguration, functions of a notebook) are only cached with a key given by with_cache_key
+    ---
+    :returns: python dictionary, None if the results of the function cannot be reused
+    """
+    key = getattr(function, "cache_key", None)
+    if key is not None:
+        return {"key": key, "version": RESULT_CACHE_VERSION}
+    owner = getattr(function, "__self__", None)
+    if isinstance(owner, types.ModuleType):
+        owner = None
+    unwrapped = inspect.unwrap(function)
+    qualified_name = getattr(unwrapped, "__qualname__", "")
+    if (not isinstance(unwrapped, (types.FunctionType, types.MethodType, types.BuiltinFunctionType))
+            or "<lambda>" in qualified_name or "<locals>" in qualified_name
+            or getattr(unwrapped, "__closure__", None)):
+        return None
+    code_version = _code_version(inspect.getmodule(unwrapped if owner is None else type(owner)))
+    if code_version is None:
+        return None
+    configuration = {"function": f"{unwrapped.__module__}.{qualified_name}", "code": code_version,
+                     "version": RESULT_CACHE_VERSION}
+    if owner is not None:
+        settings = owner.getConfiguration() if hasattr(owner, "getConfiguration") else None
+        if settings is None:
+            return None
+        configuration["settings"] = settings
+    return configuration
+
+
+def _code_version(module: types.ModuleType | None) -> str | None:
+    if module is None:
+        return None
+    package_name = module.__name__.partition(".")[0]
+    version = getattr(sys.modules.get(package_name), "__version__", None)
+    if version is not None:
+        return f"{package_name} {version}"
+    module_file = getattr(module, "__file__", None)
+    if module_file is None:
+        return None
+    return _source_hash(os.path.dirname(os.path.abspath(module_file)))
+
+
+@lru_cache(maxsize=None)
+def _source_hash(directory: str) -> str:
+    # a module of this repository depends on the others next to it, so all of them are hashed
+    source_hash = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".py"):
+            with open(os.path.join(directory, name), "rb") as file:
+                source_hash.update(name.encode("utf-8") + b"\0" + file.read())
+    return source_hash.hexdigest()[:16]
+
+
+class ResultCache:
+
+    def __init__(self, cache_dir: str = ".resultcache", max_size_bytes: int = 512 * 1024 ** 2):
+        """
+        Persistent cache of analysis results: the petri net (stored as CompactNet with its markings), the fitness
+        values and the timings of the run that produced them. An entry is keyed by the fingerprint of the log, the
+        algorithm name and the algorithm configuration, and the least recently used entries are evicted once the
+        cache grows beyond max_size_bytes
+        ---
+        :param cache_dir: directory to store the cache entries in
+        :param max_size_bytes: maximum total size of all cache entries
+        :var entries: DirectoryCache holding the entries
+        """
+        self.entries = DirectoryCache(cache_dir, max_size_bytes, "result.json")
+
+    @staticmethod
+    def key(log_fingerprint: str, algo_name: str, configuration: dict) -> str:
+        key = json.dumps({"log": log_fingerprint, "algorithm": algo_name, "configuration": configuration},
+                         sort_keys=True, default=str)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    def load(self, key: str) -> tuple | None:
+        """
+        Returns a cached result, or None if there is none for the key
+        ---
+        :returns: net (CompactNet), initial marking (None), final marking (None), average trace fitness,
+            log fitness, build seconds, replay seconds
+        """
+        entry_dir = self.entries.entryDir(key)
+        try:
+            with open(os.path.join(entry_dir, "result.json"), encoding="utf-8") as file:
+                result = json.load(file)
+            net = CompactNet.load(os.path.join(entry_dir, "net.npz"))
+        except (OSError, ValueError, KeyError):
+            return None
+        self.entries.touch(key)
+        return (net, None, None, result["average_trace_fitness"], result["log_fitness"], result["build_seconds"],
+                result["replay_seconds"])
+
+    def store(self, key: str, net: "PetriNet | CompactNet", init_marking: "Marking | None",
+              final_marking: "Marking | None", avg_trace_fitness: float, log_fitness: float,
+              build_seconds: float | None = None, replay_seconds: float | None = None) -> None:
+        compact_net = net if isinstance(net, CompactNet) else CompactNet.fromPetriNet(net, init_marking, final_marking)
+
+        def write_entry(entry_dir: str) -> None:
+            compact_net.save(os.path.join(entry_dir, "net.npz"))
+            with open(os.path.join(entry_dir, "result.json"), "w", encoding="utf-8") as file:
+                json.dump({"average_trace_fitness": avg_trace_fitness, "log_fitness": log_fitness,
+                           "build_seconds": build_seconds, "replay_seconds": replay_seconds,
+                           "created": time.time()}, file)
+
+        self.entries.write(key, write_entry)
+
+    def invalidate(self, key: str | None = None) -> None:
+        """
+        Removes the cache entry of a key, or the whole cache if no key is given
+        """
+        if key is None:
+            self.entries.invalidate()
+            return
+        self.entries.invalidate(lambda entry_dir: os.path.basename(entry_dir) == key)
+
+    def evict(self, keep: str | None = None) -> None:
+        """
+        Removes the least recently used entries until the cache is not larger than max_size_bytes
+        """
+        self.entries.evict(keep)
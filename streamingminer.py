@@ -0,0 +1,209 @@
+import csv
+import math
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from G2_AlphaAlgorithm import G2_AlphaAlgorithm
+from compactnet import CompactNet
+from logsummary import LogSummary
+from xesstream import parseTimestamp
+
+
+class StreamingMiner:
+
+    def __init__(self, windowSeconds: float, numberStartTokens=1, numberEndTokens=1, maxSetSize=None,
+                 caseTimeout: float | None = None, panes: int = 60):
+        """
+        Initialises a StreamingMiner, which mines a petri net from the events of a time ordered feed that lie in a
+        sliding window; an instance of StreamingMiner contains the following instance variables:
+        ---
+        :param windowSeconds: length of the window in seconds of event time
+        :param numberStartTokens: number of start tokens for the petri net
+        :param numberEndTokens: number of end tokens for the petri net
+        :param maxSetSize: optional cap for the number of activities on the non-anchor side of a place
+        :param caseTimeout: seconds without an event after which an open case is closed, its last activity then
+            counts as end activity (default: windowSeconds)
+        :param panes: number of panes the window is split into; relations expire one pane at a time, so the memory
+            for the counts grows with the number of panes and distinct relations, not with the number of events
+        :var windowSeconds
+        :var caseTimeout
+        :var paneSeconds: length of a pane in seconds
+        :var miner: G2_AlphaAlgorithm the nets are mined with, holds the footprint of the last mined window
+        :var openCases: ordered python dictionary with format (key: case id, value: (last activity, watermark when
+            it arrived)), least recently active case first
+        :var relationCounts: python dictionary with format (key: relation, value: count in the window); a relation
+            is (activity, following activity), (None, start activity) or (end activity, None)
+        :var watermark: latest event time seen, the window ends there
+        :var footprintChanged: true if relations entered or left the window since the last mined net
+        """
+        self.windowSeconds = windowSeconds
+        self.caseTimeout = windowSeconds if caseTimeout is None else caseTimeout
+        self.paneSeconds = windowSeconds / panes
+        self.panes = panes
+        self.miner = G2_AlphaAlgorithm(numberStartTokens, numberEndTokens, maxSetSize)
+        self.openCases: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self.relationCounts: dict[tuple, int] = dict()
+        # (pane number, relation counts of the pane), oldest pane first
+        self.__paneCounts: deque[tuple[int, Counter]] = deque()
+        self.watermark = -math.inf
+        self.footprintChanged = False
+
+    def addEvent(self, caseId: str, activity: str, timestamp: float | datetime) -> bool:
+        """
+        Adds an event of the feed; events older than the window are ignored
+        ---
+        :param caseId: id of the case of the event
+        :param activity: activity of the event
+        :param timestamp: event time in seconds since the epoch or as datetime
+        :returns: true if the footprint of the window changed
+        """
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        self.advance(timestamp)
+        if self.__paneNumber(timestamp) <= self.__paneNumber(self.watermark) - self.panes:
+            # a late event must neither replace the last activity of its case nor mark the case as recently active
+            return self.footprintChanged
+        previous = self.openCases.pop(caseId, None)
+        # a case is timed by the watermark, which never decreases, so openCases stays ordered even if the event
+        # arrived out of order; such a case times out at most the delay of the event later
+        self.openCases[caseId] = (activity, self.watermark)
+        self.__count((None, activity) if previous is None else (previous[0], activity), timestamp)
+        return self.footprintChanged
+
+    def closeCase(self, caseId: str) -> bool:
+        """
+        Closes a case whose end is known, its last activity counts as end activity at the watermark; the last event
+        of a case that timed out lies caseTimeout before it and could already have left the window
+        ---
+        :param caseId: id of the case
+        :returns: true if the footprint of the window changed
+        """
+        lastEvent = self.openCases.pop(caseId, None)
+        if lastEvent is not None:
+            self.__count((lastEvent[0], None), self.watermark)
+        return self.footprintChanged
+
+    def advance(self, timestamp: float) -> bool:
+        """
+        Moves the end of the window to timestamp: closes the cases that timed out and drops the panes that left
+        the window
+        ---
+        :param timestamp: event time in seconds since the epoch
+        :returns: true if the footprint of the window changed
+        """
+        if timestamp <= self.watermark:
+            return self.footprintChanged
+        self.watermark = timestamp
+        while self.openCases:
+            caseId, (activity, lastTimestamp) = next(iter(self.openCases.items()))
+            if lastTimestamp > timestamp - self.caseTimeout:
+                break
+            self.closeCase(caseId)
+        firstPane = self.__paneNumber(timestamp) - self.panes + 1
+        while self.__paneCounts and self.__paneCounts[0][0] < firstPane:
+            for relation, count in self.__paneCounts.popleft()[1].items():
+                self.relationCounts[relation] -= count
+                if not self.relationCounts[relation]:
+                    del self.relationCounts[relation]
+                    self.footprintChanged = True
+        return self.footprintChanged
+
+    def getWindowSummary(self) -> LogSummary:
+        """
+        Returns the directly-follows and start/end activity counts of the window as LogSummary
+        """
+        directlyFollowsCounts, startActivityCounts, endActivityCounts = dict(), dict(), dict()
+        for (source, target), count in self.relationCounts.items():
+            if source is None:
+                startActivityCounts[target] = count
+            elif target is None:
+                endActivityCounts[source] = count
+            else:
+                directlyFollowsCounts[source, target] = count
+        return LogSummary.fromCounts(directlyFollowsCounts, startActivityCounts, endActivityCounts)
+
+    def mine(self) -> CompactNet:
+        """
+        Mines the petri net of the current window
+        ---
+        :returns: CompactNet with initial and final marking
+        """
+        self.footprintChanged = False
+        return self.miner.createCompactNet(self.getWindowSummary())
+
+    def process(self, events: Iterable[tuple[str, str, float | datetime]]) -> Iterator[tuple[float, CompactNet]]:
+        """
+        Consumes a feed and yields a refreshed petri net whenever the footprint of the window changed; a window that
+        does not contain any complete case yet is not mined
+        ---
+        :param events: iterable of (case id, activity, timestamp), e.g. followCsv or a generator
+        :returns: generator of (watermark, CompactNet)
+        """
+        for caseId, activity, timestamp in events:
+            if self.addEvent(caseId, activity, timestamp) and self.__hasStartAndEnd():
+                yield self.watermark, self.mine()
+
+    def numberOfOpenCases(self) -> int:
+        return len(self.openCases)
+
+    def __count(self, relation: tuple, timestamp: float):
+        paneNumber = self.__paneNumber(timestamp)
+        if paneNumber <= self.__paneNumber(self.watermark) - self.panes:
+            return
+        # events arrive mostly in time order, so the pane is searched from the newest one
+        position = len(self.__paneCounts)
+        while position and self.__paneCounts[position - 1][0] > paneNumber:
+            position -= 1
+        if not position or self.__paneCounts[position - 1][0] < paneNumber:
+            self.__paneCounts.insert(position, (paneNumber, Counter()))
+            position += 1
+        self.__paneCounts[position - 1][1][relation] += 1
+        if relation not in self.relationCounts:
+            self.footprintChanged = True
+        self.relationCounts[relation] = self.relationCounts.get(relation, 0) + 1
+
+    def __paneNumber(self, timestamp: float) -> int:
+        return math.floor(timestamp / self.paneSeconds)
+
+    def __hasStartAndEnd(self) -> bool:
+        return (any(relation[0] is None for relation in self.relationCounts)
+                and any(relation[1] is None for relation in self.relationCounts))
+
+
+def followCsv(filePath: str, caseKey: str = "case:concept:name", activityKey: str = "concept:name",
+              timestampKey: str = "time:timestamp", pollSeconds: float = 1.0, idleSeconds: float | None = None):
+    """
+    Follows a CSV file that another process appends events to, like tail -f, and yields its events
+    ---
+    :param filePath: path of the CSV file, with a header line
+    :param caseKey: column holding the case id
+    :param activityKey: column holding the activity
+    :param timestampKey: column holding the timestamp (ISO format or seconds since the epoch)
+    :param pollSeconds: seconds to wait for new lines at the end of the file
+    :param idleSeconds: seconds without new lines after which the generator stops, None to follow forever
+    :returns: generator of (case id, activity, timestamp in seconds since the epoch)
+    """
+    with open(filePath, newline="", encoding="utf-8") as file:
+        header = next(csv.reader([file.readline()]))
+        lastLineTime = time.monotonic()
+        pending = ""
+        while True:
+            line = file.readline()
+            if not line or not line.endswith("\n"):
+                # the writer may not have finished the line yet
+                pending += line
+                if idleSeconds is not None and time.monotonic() - lastLineTime > idleSeconds:
+                    return
+                time.sleep(pollSeconds)
+                continue
+            lastLineTime = time.monotonic()
+            row = dict(zip(header, next(csv.reader([pending + line]))))
+            pending = ""
+            timestamp = row[timestampKey]
+            try:
+                timestamp = float(timestamp)
+            except ValueError:
+                timestamp = parseTimestamp(timestamp)
+            yield row[caseKey], row[activityKey], timestamp
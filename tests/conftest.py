@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the modules live in the repository root, so the tests can import them however pytest is started
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
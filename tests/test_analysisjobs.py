@@ -0,0 +1,36 @@
+import os
+import signal
+import time
+
+import analysisjobs
+from G2_AlphaAlgorithm import G2_AlphaAlgorithm
+from analysisjobs import LogSource, run_jobs
+from logsummary import LogSummary, acceptsLogSummary
+
+
+@acceptsLogSummary
+def mineG2(log):
+    return G2_AlphaAlgorithm(1, 1).createCompactNet(log)
+
+
+def blockedJob(log):
+    # like a long call into native code, the job cannot be interrupted by the SIGALRM of its timeout
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+    time.sleep(60)
+
+
+def dyingJob(log):
+    os._exit(1)
+
+
+def test_jobs_that_do_not_return_are_given_up_on(monkeypatch):
+    monkeypatch.setattr(analysisjobs, "TIMEOUT_GRACE_SECONDS", 0.5)
+    summary = LogSummary()
+    for trace in (["a", "b", "d"], ["a", "c", "d"]):
+        summary.addTrace(trace)
+    startTime = time.monotonic()
+    results = run_jobs([blockedJob, dyingJob, mineG2], LogSource(log_summary=summary), workers=3, timeout=0.5)
+    assert time.monotonic() - startTime < 10
+    assert isinstance(results[0], TimeoutError)
+    assert isinstance(results[1], TimeoutError)
+    assert results[2][4] == 1.0
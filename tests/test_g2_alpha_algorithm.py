@@ -0,0 +1,61 @@
+import pandas as pd
+
+from G2_AlphaAlgorithm import G2_AlphaAlgorithm
+from logsummary import LogSummary
+
+FIRST_BATCH = [["a", "b", "d"], ["a", "c", "d"], ["a", "b", "d"]]
+SECOND_BATCH = [["a", "c", "b", "d"], ["a", "e", "d"]]
+
+
+def summaryOf(traces) -> LogSummary:
+    summary = LogSummary()
+    for trace in traces:
+        summary.addTrace(trace)
+    return summary
+
+
+def test_update_merges_new_traces_into_data_log():
+    algorithm = G2_AlphaAlgorithm(1, 1)
+    algorithm.createPetriNet(summaryOf(FIRST_BATCH))
+    algorithm.update(summaryOf(SECOND_BATCH))
+    dataLog = algorithm.getDataLog()
+    wholeLog = summaryOf(FIRST_BATCH + SECOND_BATCH)
+    assert dataLog.numberOfCases == wholeLog.numberOfCases
+    assert dataLog.numberOfEvents == wholeLog.numberOfEvents
+    assert dataLog.getVariantsAsTuples() == wholeLog.getVariantsAsTuples()
+    assert dataLog.getDirectlyFollows() == wholeLog.getDirectlyFollows()
+    assert dataLog.getStartActivities() == wholeLog.getStartActivities()
+    assert dataLog.getEndActivities() == wholeLog.getEndActivities()
+
+
+def test_update_does_not_change_the_first_batch():
+    firstBatch = summaryOf(FIRST_BATCH)
+    algorithm = G2_AlphaAlgorithm(1, 1)
+    algorithm.createPetriNet(firstBatch)
+    algorithm.update(summaryOf(SECOND_BATCH))
+    assert firstBatch.numberOfCases == len(FIRST_BATCH)
+
+
+def test_log_summary_of_an_event_table():
+    rows = [(f"case {caseNr}", activity) for caseNr, trace in enumerate(FIRST_BATCH) for activity in trace]
+    frame = pd.DataFrame(rows, columns=["case:concept:name", "concept:name"])
+    algorithm = G2_AlphaAlgorithm(1, 1)
+    algorithm.createPetriNet(frame)
+    logSummary = algorithm.getLogSummary()
+    assert isinstance(logSummary, LogSummary)
+    assert logSummary.getVariantsAsTuples() == summaryOf(FIRST_BATCH).getVariantsAsTuples()
+
+
+def test_update_of_an_event_table_merges_when_the_log_is_requested():
+    rows = [(f"case {caseNr}", activity) for caseNr, trace in enumerate(FIRST_BATCH) for activity in trace]
+    frame = pd.DataFrame(rows, columns=["case:concept:name", "concept:name"])
+    algorithm = G2_AlphaAlgorithm(1, 1)
+    algorithm.createPetriNet(frame)
+    algorithm.update(summaryOf(SECOND_BATCH))
+    algorithm.update(summaryOf([["a", "b", "d"]]))
+    assert "mergeLogUpdates" not in algorithm.getPhaseProfile()
+    logSummary = algorithm.getLogSummary()
+    wholeLog = summaryOf(FIRST_BATCH + SECOND_BATCH + [["a", "b", "d"]])
+    assert logSummary.getVariantsAsTuples() == wholeLog.getVariantsAsTuples()
+    assert algorithm.getPhaseProfile()["mergeLogUpdates"]["calls"] == 1
+    assert algorithm.getDataLog() is logSummary
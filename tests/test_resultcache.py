@@ -0,0 +1,35 @@
+from G2_AlphaAlgorithm import G2_AlphaAlgorithm
+from logcache import LogCache
+from resultcache import ResultCache, algorithm_configuration, with_cache_key
+
+
+def test_lambdas_and_closures_are_only_cached_with_a_key():
+    tokens = 2
+    assert algorithm_configuration(lambda log: G2_AlphaAlgorithm(2, 2).createPetriNet(log)) is None
+
+    def mineWithTokens(log):
+        return G2_AlphaAlgorithm(tokens, tokens).createPetriNet(log)
+
+    assert algorithm_configuration(mineWithTokens) is None
+    configuration = algorithm_configuration(with_cache_key(lambda log: None, "G2 2/2"))
+    assert configuration["key"] == "G2 2/2"
+
+
+def test_configuration_keys_the_settings_and_the_code():
+    configuration = algorithm_configuration(G2_AlphaAlgorithm(2, 2).createPetriNet)
+    assert configuration["settings"]["numberStartTokens"] == 2
+    assert configuration["code"]
+    assert configuration != algorithm_configuration(G2_AlphaAlgorithm(1, 1).createPetriNet)
+
+
+def test_caches_share_the_entry_handling(tmp_path):
+    resultCache = ResultCache(str(tmp_path / "results"), max_size_bytes=0)
+    net = G2_AlphaAlgorithm(1, 1).createCompactNet([[{"concept:name": "a"}, {"concept:name": "b"}]])
+    resultCache.store("first", net, None, None, 1.0, 1.0, 0.1, 0.1)
+    resultCache.store("second", net, None, None, 0.5, 0.5, 0.1, 0.1)
+    # beyond the size limit, only the entry just stored is kept
+    assert resultCache.load("first") is None
+    assert resultCache.load("second")[4] == 0.5
+    resultCache.invalidate("second")
+    assert resultCache.load("second") is None
+    assert LogCache(str(tmp_path / "logs")).entries.entryDirs() == []
@@ -0,0 +1,52 @@
+from streamingminer import StreamingMiner
+
+
+def test_late_events_are_ignored():
+    miner = StreamingMiner(10, panes=10, caseTimeout=1000)
+    miner.addEvent("case1", "a", 100)
+    miner.addEvent("case1", "b", 101)
+    miner.addEvent("case2", "a", 101.5)
+    # older than the window: neither counted nor the last activity of case1
+    miner.addEvent("case1", "late", 50)
+    assert list(miner.openCases) == ["case1", "case2"]
+    assert miner.openCases["case1"] == ("b", 101)
+    miner.addEvent("case1", "c", 102)
+    assert ("b", "c") in miner.relationCounts
+    assert not any("late" in relation for relation in miner.relationCounts)
+
+
+def test_late_event_does_not_delay_eviction():
+    miner = StreamingMiner(10, panes=10, caseTimeout=5)
+    miner.addEvent("case1", "a", 100)
+    miner.addEvent("case2", "a", 103)
+    miner.addEvent("case1", "late", 80)
+    # case1 timed out at 105, case2 is still open
+    miner.advance(106)
+    assert list(miner.openCases) == ["case2"]
+    assert miner.relationCounts[("a", None)] == 1
+
+
+def test_process_emits_nets_with_default_timeout():
+    events = [(f"case{i}", activity, 10 * i + offset)
+              for i in range(300) for offset, activity in enumerate(("a", "b" if i % 2 else "c", "d"))]
+    miner = StreamingMiner(100, panes=10)
+    nets = list(miner.process(events))
+    # cases time out one window after their last event, their end activity must still enter the window
+    assert nets
+    assert ("d", None) in miner.relationCounts
+
+
+def test_out_of_order_event_keeps_open_cases_ordered():
+    miner = StreamingMiner(10, panes=10, caseTimeout=5)
+    miner.addEvent("case1", "a", 100)
+    miner.addEvent("case2", "a", 103)
+    # in the window but older than case2's event: case1 becomes the most recently active case
+    miner.addEvent("case1", "b", 101)
+    miner.addEvent("case3", "a", 104)
+    assert list(miner.openCases) == ["case2", "case1", "case3"]
+    times = [lastTimestamp for _, lastTimestamp in miner.openCases.values()]
+    assert times == sorted(times)
+    miner.advance(108.5)
+    assert list(miner.openCases) == ["case3"]
+    assert miner.relationCounts[("a", None)] == 1
+    assert miner.relationCounts[("b", None)] == 1
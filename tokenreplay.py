@@ -0,0 +1,82 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from compactnet import CompactNet
+
+if TYPE_CHECKING:
+    from pm4py.objects.log.obj import EventLog
+    from pm4py.objects.petri_net.obj import PetriNet, Marking
+
+
+def token_based_replay_fitness(variant_counts: dict[tuple[str], int], net: "PetriNet | CompactNet",
+                               init_marking: "Marking | None" = None, final_marking: "Marking | None" = None,
+                               log: "EventLog | None" = None) -> dict[str, float]:
+    """
+    Token-based replay fitness that replays every distinct variant once and weights the result by its frequency.
+    All variants are replayed together, one event position per step, on the incidence matrices of the net;
+    the returned values are the ones of pm4py.fitness_token_based_replay. Nets with invisible transitions or
+    duplicate labels are handed to pm4py, which needs the event log for that
+    ---
+    :param variant_counts: python dictionary with format (key: tuple of activities, value: number of traces)
+    :param net: petri net, as defined by the pm4py library, or CompactNet
+    :param init_marking: initial marking (only for a pm4py petri net)
+    :param final_marking: final marking (only for a pm4py petri net)
+    :param log: event log for the pm4py fallback
+    :returns: python dictionary with perc_fit_traces, average_trace_fitness, log_fitness, percentage_of_fitting_traces
+    """
+    compact_net = net if isinstance(net, CompactNet) else CompactNet.fromPetriNet(net, init_marking, final_marking)
+    if not compact_net.hasUniqueVisibleLabels():
+        if log is None or isinstance(net, CompactNet):
+            raise ValueError("Nets with invisible or duplicate transitions need the pm4py replay on the event log")
+        import pm4py
+        return pm4py.fitness_token_based_replay(log, net, init_marking, final_marking)
+    variants = sorted(variant_counts.items(), key=lambda item: len(item[0]), reverse=True)
+    counts = np.array([count for _, count in variants], dtype=np.int64)
+    lengths = np.array([len(variant) for variant, _ in variants], dtype=np.int64)
+    transition_ids = {label: transition_id for transition_id, label in enumerate(compact_net.transitionLabels)}
+    # transition ids of every variant, padded with -1; the variants are sorted by length, so the variants that are
+    # still replaying at a position always form a prefix of the rows
+    steps = np.full((len(variants), lengths.max(initial=0)), -1, dtype=np.int64)
+    for row, (variant, _) in enumerate(variants):
+        steps[row, :len(variant)] = [transition_ids.get(activity, -1) for activity in variant]
+    has_unknown_activity = np.zeros(len(variants), dtype=bool)
+
+    pre = np.vstack([compact_net.preIncidence().T.astype(np.int64), np.zeros(len(compact_net.placeNames), dtype=np.int64)])
+    post = np.vstack([compact_net.postIncidence().T.astype(np.int64), np.zeros(len(compact_net.placeNames), dtype=np.int64)])
+    markings = np.tile(compact_net.initialMarking.astype(np.int64), (len(variants), 1))
+    produced = np.full(len(variants), compact_net.initialMarking.sum(), dtype=np.int64)
+    consumed = np.zeros(len(variants), dtype=np.int64)
+    missing = np.zeros(len(variants), dtype=np.int64)
+    for position in range(steps.shape[1]):
+        active = int(np.count_nonzero(lengths > position))
+        fired = steps[:active, position]
+        # activities without a transition (row -1 of the padded incidence matrices) neither consume nor produce
+        has_unknown_activity[:active] |= fired < 0
+        needed = pre[fired]
+        lacking = np.maximum(needed - markings[:active], 0)
+        missing[:active] += lacking.sum(axis=1)
+        markings[:active] += lacking - needed + post[fired]
+        consumed[:active] += needed.sum(axis=1)
+        produced[:active] += post[fired].sum(axis=1)
+    final_marking_vector = compact_net.finalMarking.astype(np.int64)
+    lacking = np.maximum(final_marking_vector - markings, 0)
+    missing += lacking.sum(axis=1)
+    consumed += final_marking_vector.sum()
+    remaining = (markings + lacking - final_marking_vector).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trace_fitness = np.where((consumed > 0) & (produced > 0),
+                                 0.5 * (1 - missing / consumed) + 0.5 * (1 - remaining / produced), 1.0)
+    is_fit = (missing == 0) & (remaining == 0) & ~has_unknown_activity
+    number_of_traces = counts.sum()
+    total_consumed = (consumed * counts).sum()
+    total_produced = (produced * counts).sum()
+    perc_fit_traces, average_trace_fitness, log_fitness = 0.0, 0.0, 0.0
+    if number_of_traces > 0 and total_consumed > 0 and total_produced > 0:
+        perc_fit_traces = 100.0 * float(counts[is_fit].sum()) / float(number_of_traces)
+        average_trace_fitness = float((trace_fitness * counts).sum()) / float(number_of_traces)
+        log_fitness = (0.5 * (1 - (missing * counts).sum() / total_consumed)
+                       + 0.5 * (1 - (remaining * counts).sum() / total_produced))
+    return {"perc_fit_traces": perc_fit_traces, "average_trace_fitness": average_trace_fitness,
+            "log_fitness": float(log_fitness), "percentage_of_fitting_traces": perc_fit_traces}
@@ -0,0 +1,78 @@
+import gzip
+from datetime import datetime
+from xml.etree.ElementTree import iterparse
+
+from logsummary import LogSummary
+
+
+def openXes(filePath: str):
+    return gzip.open(filePath, "rb") if filePath.endswith(".gz") else open(filePath, "rb")
+
+
+def parseTimestamp(value: str) -> float:
+    """
+    Converts an XES date value to seconds since the epoch
+    """
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def iterateTraces(filePath: str, activityKey: str = "concept:name", timestampKey: str = "time:timestamp",
+                  caseIdKey: str = "concept:name"):
+    """
+    Iterates over the traces of a .xes or .xes.gz file without building the whole document; every parsed trace is
+    removed from the tree before the next one is read
+    ---
+    :param filePath: path to the log file
+    :param activityKey: event attribute holding the activity
+    :param timestampKey: event attribute holding the timestamp, None to skip parsing timestamps
+    :param caseIdKey: trace attribute holding the case id
+    :returns: generator of (case id, list of activities, list of timestamps in seconds since the epoch or None)
+    """
+    with openXes(filePath) as file:
+        context = iterparse(file, events=("start", "end"))
+        _, root = next(context)
+        tags = [root.tag.rsplit("}", 1)[-1]]
+        caseId, activities, timestamps = None, [], []
+        activity, timestamp = None, None
+        for eventType, element in context:
+            tag = element.tag.rsplit("}", 1)[-1]
+            if eventType == "start":
+                tags.append(tag)
+                if tag == "trace":
+                    caseId, activities, timestamps = None, [], []
+                elif tag == "event":
+                    activity, timestamp = None, None
+                continue
+            tags.pop()
+            parent = tags[-1] if tags else None
+            if parent == "event":
+                key = element.get("key")
+                if key == activityKey:
+                    activity = element.get("value")
+                elif timestampKey is not None and key == timestampKey:
+                    timestamp = parseTimestamp(element.get("value"))
+            elif parent == "trace" and tag != "event" and element.get("key") == caseIdKey:
+                caseId = element.get("value")
+            elif tag == "event":
+                if activity is not None:
+                    activities.append(activity)
+                    timestamps.append(timestamp)
+                element.clear()
+            elif tag == "trace":
+                yield caseId, activities, timestamps
+                root.clear()
+
+
+def readLogSummary(filePath: str, activityKey: str = "concept:name") -> LogSummary:
+    """
+    Streams a .xes or .xes.gz file trace by trace into a LogSummary, so that only the interned activities and the
+    variant and directly-follows counts are kept in memory
+    ---
+    :param filePath: path to the log file
+    :param activityKey: event attribute holding the activity
+    :returns: LogSummary of the log
+    """
+    summary = LogSummary()
+    for _, activities, _ in iterateTraces(filePath, activityKey=activityKey, timestampKey=None):
+        summary.addTrace(activities)
+    return summary